@@ -22,6 +22,58 @@ class Settings(BaseSettings):
     mail_user: str
     mail_pass: str
 
+    sql_echo: bool = False
+    db_read_pool_size: int = 8
+    sqlite_busy_timeout: float = 5.0
+    sqlite_cache_bytes: int = 64 * 1024 * 1024
+    sqlite_mmap_bytes: int = 256 * 1024 * 1024
+
+    upstream_connection_limit: int = 100
+    upstream_connection_limit_per_host: int = 20
+    upstream_keepalive_timeout: float = 30.0
+    upstream_dns_cache_ttl: int = 300
+    upstream_connect_timeout: float = 5.0
+    upstream_total_timeout: float = 30.0
+    upstream_failure_threshold: int = 5
+    upstream_reset_timeout: float = 30.0
+    upstream_negative_ttl: float = 60.0
+    upstream_max_concurrency: int = 16
+    upstream_max_per_route: int = 4
+    upstream_rate_limit: float = 20.0
+    upstream_rate_burst: int = 40
+
+    proxy_cache_ttl: int = 300
+    proxy_cache_stale: int = 3600
+    response_cache_max_entries: int = 1024
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+
+    image_max_bytes: int = 10 * 1024 * 1024
+    image_cache_max_bytes: int = 512 * 1024 * 1024
+    image_cache_interval: float = 60.0
+    image_max_age: int = 7 * 24 * 3600
+    image_variant_workers: int = 2
+    image_variant_quality: int = 80
+
+    prefetch_images_on_startup: bool = False
+    prefetch_concurrency: int = 8
+
+    offline: bool = False
+
+    sync_enabled: bool = True
+    sync_interval: float = 60.0
+    sync_concurrency: int = 3
+    hydration_batch_size: int = 25
+
+    like_flush_interval: float = 0.005
+    like_batch_size: int = 500
+
+    compression_min_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+
+    page_size: int = 100
+    max_page_size: int = 500
+
     def configure_logging(self):
         logging.basicConfig(level=self.log_level.upper())
         logging.info(f"Logging level set to {self.log_level}")
@@ -0,0 +1,96 @@
+import logging
+from typing import Any, Iterable
+
+from sqlalchemy import Table, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Case-insensitive unique columns besides the primary key, by table
+# (see app.migrations).
+UNIQUE_NOCASE_COLUMNS = {"user": "email"}
+
+
+async def without_local_conflicts(
+    db: AsyncSession, table: Table, rows: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Drops the upstream rows that would overwrite a row created locally, or
+    take a unique value already used by another row.
+    """
+    taken_ids = set(
+        await db.scalars(
+            select(table.c.id).where(
+                table.c.upstream.is_(False),
+                table.c.id.in_([row["id"] for row in rows]),
+            )
+        )
+    )
+    kept = [row for row in rows if row["id"] not in taken_ids]
+
+    name = UNIQUE_NOCASE_COLUMNS.get(table.name)
+    if name is not None:
+        column = table.c[name]
+        values = [row[name] for row in kept if row.get(name) is not None]
+        owners = {
+            value.lower(): id
+            for value, id in (
+                await db.execute(
+                    select(column, table.c.id).where(
+                        column.collate("NOCASE").in_(values)
+                    )
+                )
+            ).all()
+        }
+        unique = []
+        for row in kept:
+            value = row.get(name)
+            if value is not None:
+                if owners.setdefault(value.lower(), row["id"]) != row["id"]:
+                    continue
+            unique.append(row)
+        kept = unique
+
+    if len(kept) < len(rows):
+        skipped = sorted({row["id"] for row in rows} - {row["id"] for row in kept})
+        logger.warning(
+            f"Skipped upstream {table.name} rows conflicting with local ones: "
+            f"{', '.join(map(str, skipped))}"
+        )
+    return kept
+
+
+async def upsert_rows(
+    db: AsyncSession, db_model, rows: Iterable[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Writes `rows` with a single executemany INSERT ... ON CONFLICT DO UPDATE.
+
+    Keys that are not columns of `db_model` are ignored, and only the
+    columns present in the rows are updated on conflict, so ingesting a
+    partial payload never clears the other columns of an existing row.
+
+    Rows of a model with an `upstream` column are mirrored from the JEB API:
+    they are stored with `upstream` set, and a row that would overwrite a
+    locally created one, or reuse a unique value, is skipped. Returns the
+    rows written.
+    """
+    table = db_model.__table__
+    rows = [{k: v for k, v in row.items() if k in table.c} for row in rows]
+    mirrored = "upstream" in table.c
+    if mirrored and rows:
+        rows = await without_local_conflicts(db, table, rows)
+        for row in rows:
+            row["upstream"] = True
+    if not rows:
+        return rows
+
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={name: stmt.excluded[name] for name in rows[0] if name != "id"},
+        where=table.c.upstream if mirrored else None,
+    )
+    await db.execute(stmt, rows)
+    return rows
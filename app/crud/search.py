@@ -0,0 +1,85 @@
+import heapq
+import html
+import re
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas.search import SearchHit, SearchKind
+
+# Kind -> (full-text index from `migrations.SEARCH_INDEXES`, bm25 weight of
+# each indexed column). Matches in names and titles rank first.
+SEARCH_TARGETS: dict[SearchKind, tuple[str, tuple[float, ...]]] = {
+    "startups": ("startup_fts", (10.0, 2.0, 4.0, 4.0)),
+    "projects": ("project_fts", (10.0, 2.0)),
+    "news": ("news_fts", (10.0, 2.0)),
+}
+
+MAX_TERMS = 8
+SNIPPET_TOKENS = 16
+TERM = re.compile(r"\w+")
+# Private use characters: the text is escaped before they become <mark>.
+MARK_OPEN, MARK_CLOSE = "\ue000", "\ue001"
+
+
+def build_match_query(query: str) -> str | None:
+    """
+    Turns user input into an FTS5 query matching every word as a prefix.
+
+    Each word is quoted, so FTS5 operators and column filters in the input
+    are searched as plain text. Returns None if the input has no word.
+    """
+    terms = TERM.findall(query)[:MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def marked_html(value: str | None) -> str:
+    return (
+        html.escape(value or "")
+        .replace(MARK_OPEN, "<mark>")
+        .replace(MARK_CLOSE, "</mark>")
+    )
+
+
+async def search(
+    db: AsyncSession, query: str, kinds: Iterable[SearchKind], limit: int
+) -> list[SearchHit]:
+    """Returns the best `limit` matches among `kinds`, by ascending bm25."""
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    hits = []
+    for kind in dict.fromkeys(kinds):
+        index, weights = SEARCH_TARGETS[kind]
+        rows = await db.execute(
+            text(
+                f"SELECT rowid, bm25({index}, {', '.join(map(str, weights))}), "
+                f"highlight({index}, 0, :open, :close), "
+                f"snippet({index}, -1, :open, :close, '…', :tokens) "
+                f"FROM {index} WHERE {index} MATCH :match "
+                f"ORDER BY bm25({index}, {', '.join(map(str, weights))}) "
+                "LIMIT :limit"
+            ),
+            {
+                "open": MARK_OPEN,
+                "close": MARK_CLOSE,
+                "tokens": SNIPPET_TOKENS,
+                "match": match,
+                "limit": limit,
+            },
+        )
+        hits += [
+            SearchHit(
+                kind=kind,
+                id=id,
+                title=marked_html(title),
+                snippet=marked_html(snippet),
+                score=score,
+            )
+            for id, score, title, snippet in rows
+        ]
+    return heapq.nsmallest(limit, hits, key=lambda hit: hit.score)
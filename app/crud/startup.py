@@ -7,8 +7,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from ..endpoints.auth import as_enough_perms, get_user_from_token
+from ..helpers.pagination import Page, PageRequest, paginate
+from ..helpers.sparse_fields import select_fields
+from ..jeb_schema import StartupBase, StartupDetail
 from ..models import Startup
 from ..schemas.startup import StartupCreate, StartupUpdate
+from .bulk import upsert_rows
 
 
 async def create_startup(
@@ -36,6 +40,27 @@ async def create_startup(
     return new_startup
 
 
+async def upsert_startup_details(db: AsyncSession, details: Sequence[StartupDetail]):
+    """
+    Writes upstream startup details and their founders, one statement per
+    table. Founders of a startup skipped as local are skipped along with it.
+    """
+    startups = await upsert_rows(
+        db, Startup, (detail.model_dump(exclude={"founders"}) for detail in details)
+    )
+    written = {startup["id"] for startup in startups}
+    await upsert_rows(
+        db,
+        Founder,
+        (
+            founder.model_dump()
+            for detail in details
+            if detail.id in written
+            for founder in detail.founders
+        ),
+    )
+
+
 async def get_startup(db: AsyncSession, startup_id: int) -> Startup:
     result = await db.execute(
         select(Startup)
@@ -51,15 +76,11 @@ async def get_startup(db: AsyncSession, startup_id: int) -> Startup:
 
 
 async def get_startups(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> Sequence[Startup]:
-    result = await db.execute(
-        select(Startup)
-        .offset(skip)
-        .limit(limit)
-        .options(selectinload(Startup.founders))
+    db: AsyncSession, page: PageRequest, fields: tuple[str, ...] | None = None
+) -> Page:
+    return await paginate(
+        db, select_fields(Startup, StartupBase, fields), Startup.id, page
     )
-    return result.scalars().all()
 
 
 async def update_startup(
@@ -1,12 +1,13 @@
-from typing import Sequence
-
 from fastapi import Header, HTTPException
-from passlib.hash import bcrypt
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from ..endpoints.auth import get_user_from_token
+from ..endpoints.auth import get_user_from_token, hash_password
+from ..helpers.pagination import Page, PageRequest, paginate
+from ..helpers.response_cache import response_cache
+from ..helpers.sparse_fields import select_fields
+from ..jeb_schema import UserBase
 from ..models import User
 from ..schemas.users import PatchRequest, UpdateRequest
 
@@ -20,15 +21,14 @@ async def get_user(db: AsyncSession, user_id: int) -> User | None:
 
 
 async def get_user_by_email(db: AsyncSession, user_email: EmailStr) -> User | None:
-    result = await db.execute(select(User).where(User.email == user_email))
+    result = await db.execute(select(User).where(User.email_is(user_email)))
     return result.scalars().first()
 
 
 async def get_users(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> Sequence[User]:
-    result = await db.execute(select(User).offset(skip).limit(limit))
-    return result.scalars().all()
+    db: AsyncSession, page: PageRequest, fields: tuple[str, ...] | None = None
+) -> Page:
+    return await paginate(db, select_fields(User, UserBase, fields), User.id, page)
 
 
 async def update_user(
@@ -43,7 +43,10 @@ async def update_user(
         raise HTTPException(403, "You are not the user")
 
     if getattr(user, "email") != user_in.email:
-        result = await db.execute(select(User).filter(User.email == user_in.email))
+        # Excludes the user itself, who may only be changing the case.
+        result = await db.execute(
+            select(User).filter(User.email_is(user_in.email), User.id != user_id)
+        )
         collected = result.scalars().all()
         if len(collected) > 0:
             raise HTTPException(status_code=400, detail="Email already used")
@@ -52,7 +55,7 @@ async def update_user(
 
     for key, value in data.items():
         if key == "password" and value:
-            setattr(user, "auth", bcrypt.hash(value))
+            setattr(user, "auth", hash_password(value))
         elif key == "email" and value:
             setattr(user, "email", str(value))
         elif value is not None:
@@ -61,6 +64,7 @@ async def update_user(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    response_cache.invalidate("users")
     return user
 
 
@@ -75,7 +79,10 @@ async def patch_user(
     if requester != user:
         raise HTTPException(403, "You are not the user")
     if user_in.email and getattr(user, "email") != user_in.email:
-        result = await db.execute(select(User).filter(User.email == user_in.email))
+        # Excludes the user itself, who may only be changing the case.
+        result = await db.execute(
+            select(User).filter(User.email_is(user_in.email), User.id != user_id)
+        )
         collected = result.scalars().all()
         if len(collected) > 0:
             raise HTTPException(status_code=400, detail="Email already used")
@@ -84,7 +91,7 @@ async def patch_user(
 
     for key, value in data.items():
         if key == "password" and value:
-            setattr(user, "auth", bcrypt.hash(value))
+            setattr(user, "auth", hash_password(value))
         elif key == "email" and value:
             setattr(user, "email", str(value))
         elif value is not None:
@@ -93,6 +100,7 @@ async def patch_user(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    response_cache.invalidate("users")
     return user
 
 
@@ -107,3 +115,6 @@ async def delete_user(
         raise HTTPException(403, "You are not the user")
     await db.delete(user)
     await db.commit()
+    response_cache.invalidate("users")
+    # Their likes went with them.
+    response_cache.invalidate("projects")
@@ -1,9 +1,11 @@
-import asyncio
 from logging import getLogger
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
-from sqlmodel import select
+
+from .config import settings
+from .migrations import run_migrations
 
 logger = getLogger(__name__)
 
@@ -11,13 +13,56 @@ DATABASE_URL = "sqlite+aiosqlite:///app.db"
 
 Base = declarative_base()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# SQLite allows a single writer at a time: writes share one connection and
+# queue for it in the pool instead of contending for the file lock. With WAL,
+# readers on their own pool are never blocked by that writer.
+engine = create_async_engine(
+    DATABASE_URL, echo=settings.sql_echo, pool_size=1, max_overflow=0
+)
+read_engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.sql_echo,
+    pool_size=settings.db_read_pool_size,
+    max_overflow=0,
+)
+
+
+def configure_connection(dbapi_connection, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    if not read_only:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout * 1000)}")
+    # A negative cache_size is in KiB rather than pages.
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_bytes // 1024}")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_bytes}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+event.listen(
+    engine.sync_engine,
+    "connect",
+    lambda conn, _: configure_connection(conn, read_only=False),
+)
+event.listen(
+    read_engine.sync_engine,
+    "connect",
+    lambda conn, _: configure_connection(conn, read_only=True),
+)
 
 async_session = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
     class_=AsyncSession,
 )
+read_session = async_sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
 
 
 async def get_session():
@@ -25,31 +70,32 @@ async def get_session():
         yield session
 
 
+async def get_read_session():
+    """Session for handlers that only read, served by the read-only pool."""
+    async with read_session() as session:
+        yield session
+
+
+async def close_db():
+    await read_engine.dispose()
+    await engine.dispose()
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
 
-    from passlib.hash import bcrypt
 
-    from .endpoints.events import list_events
-    from .endpoints.investors import list_investors
-    from .endpoints.news import list_news
-    from .endpoints.partners import list_partners
-    from .endpoints.startups import list_startup
-    from .endpoints.users import route_list_users
-
-    async def run_task(task_func):
-        async with async_session() as session:
-            await task_func(session)
-
-    await asyncio.gather(
-        run_task(route_list_users),
-        run_task(list_startup),
-        run_task(list_events),
-        run_task(list_news),
-        run_task(list_partners),
-        run_task(list_investors),
-    )
+async def seed_admin():
+    """
+    Creates the demo admin account if it does not exist yet.
+
+    Run once the warm-up has mirrored the upstream users, so the account
+    takes an id after theirs.
+    """
+    from passlib.hash import bcrypt
+    from sqlalchemy import select
 
     async with async_session() as session:
         # TODO: remove
@@ -60,7 +106,7 @@ async def init_db():
         from .models import User
 
         existing_user = await session.scalar(
-            select(User).where(User.email == admin_email)
+            select(User).where(User.email_is(admin_email))
         )
 
         if not existing_user:
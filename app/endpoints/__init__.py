@@ -37,6 +37,8 @@ def register_all(app: FastAPI):
         "users",
         "auth",
         "projects",
+        "search",
+        "health",
     ):
         mod = importlib.import_module(f".{module}", package="app.endpoints")
         app.include_router(mod.router, prefix=f"/api/{module}", tags=[f"{module}"])
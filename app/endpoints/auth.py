@@ -1,18 +1,18 @@
 import logging
 import secrets
 from datetime import datetime, timedelta, timezone
+from functools import cache
 
 import jwt
 from fastapi import APIRouter, Depends, Header, HTTPException
-from jinja2 import Template
-from passlib.hash import bcrypt
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
 from ..config import settings
-from ..db import get_session
+from ..db import get_read_session, get_session
 from ..helpers.mail import EmailSchema, send_email
+from ..helpers.response_cache import response_cache
 from ..models import User
 from ..proxy_schema import Message
 from ..schemas.users import PasswordStr
@@ -24,6 +24,35 @@ ACCES_TOKEN_TIMEOUT = 42
 ALGORITHM = "HS256"
 
 
+# passlib and jinja2 are only imported by the requests that need them.
+def hash_password(password: str) -> str:
+    from passlib.hash import bcrypt
+
+    return bcrypt.hash(password)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    from passlib.hash import bcrypt
+
+    return bcrypt.verify(password, hashed)
+
+
+@cache
+def get_verification_template():
+    from jinja2 import Template
+
+    with open("app/templates/auth_verification.html") as file:
+        return Template(file.read())
+
+
+def render_verification_email(code: int) -> str:
+    return get_verification_template().render(
+        verification_url=f"http://localhost:8000/api/auth/verify/",
+        verification_code=str(code).zfill(6),
+        current_year=datetime.now(timezone.utc).year,
+    )
+
+
 def decode_access_token(token: str):
     """
     Decodes a JWT access token and returns its payload.
@@ -166,7 +195,7 @@ def as_enough_perms(perm: str, user: User):
     },
 )
 async def register(data: RegisterRequest, db: AsyncSession = Depends(get_session)):
-    result = await db.execute(select(User).filter(User.email == data.email))
+    result = await db.execute(select(User).filter(User.email_is(data.email)))
     collected = result.scalars().all()
     if len(collected) > 0:
         return AuthResponse(
@@ -177,7 +206,7 @@ async def register(data: RegisterRequest, db: AsyncSession = Depends(get_session
 
     code = secrets.randbelow(10**6)
     user = User(
-        auth=bcrypt.hash(data.password),
+        auth=hash_password(data.password),
         email=data.email,
         name=data.name,
         verified_email=False,
@@ -186,17 +215,10 @@ async def register(data: RegisterRequest, db: AsyncSession = Depends(get_session
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    response_cache.invalidate("users")
 
     token = create_access_token({"id": user.id, "email": user.email})
-    with open("app/templates/auth_verification.html") as file:
-        template_str = file.read()
-
-    jinja_template: Template = Template(template_str)
-    body = jinja_template.render(
-        verification_url=f"http://localhost:8000/api/auth/verify/",
-        verification_code=str(code).zfill(6),
-        current_year=datetime.now(timezone.utc).year,
-    )
+    body = render_verification_email(code)
 
     await send_email(
         EmailSchema(
@@ -218,15 +240,7 @@ async def resend_verification_code(
     user = await get_user_from_token(db, authorization)
     code = secrets.randbelow(10**6)
 
-    with open("app/templates/auth_verification.html") as file:
-        template_str = file.read()
-
-    jinja_template: Template = Template(template_str)
-    body = jinja_template.render(
-        verification_url=f"http://localhost:8000/api/auth/verify/",
-        verification_code=str(code).zfill(6),
-        current_year=datetime.now(timezone.utc).year,
-    )
+    body = render_verification_email(code)
 
     setattr(user, "verification_code", code)
     await db.commit()
@@ -253,9 +267,9 @@ async def resend_verification_code(
 async def login(
     data: LoginRequest, db: AsyncSession = Depends(get_session)
 ) -> AuthResponse:
-    result = await db.execute(select(User).filter(User.email == data.email))
+    result = await db.execute(select(User).filter(User.email_is(data.email)))
     user = result.scalars().first()
-    if not user or not bcrypt.verify(data.password, str(user.authentication_string)):
+    if not user or not verify_password(data.password, str(user.authentication_string)):
         raise HTTPException(status_code=401, detail="Invalid Credentials")
 
     token = create_access_token({"id": user.id, "email": user.email})
@@ -264,6 +278,6 @@ async def login(
 
 @router.get("/me")
 async def get_me(
-    db: AsyncSession = Depends(get_session), authorization: str = Header(None)
+    db: AsyncSession = Depends(get_read_session), authorization: str = Header(None)
 ):
     return await get_user_from_token(db, authorization)
@@ -2,22 +2,29 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db import get_session
+from ..db import get_read_session
 from ..helpers.caching_proxy import cached_endpoint, cached_list_endpoint, get_image
+from ..helpers.pagination import PageRequest, page_request, paginate
+from ..helpers.sparse_fields import field_selection, select_fields
 from ..jeb_schema import EventBase
 from ..models import Event
 
 router = APIRouter()
 
 
-@cached_list_endpoint("/events", db_model=Event, pydantic_model=EventBase)
-async def list_events(db: AsyncSession = Depends(get_session)):
-    result = await db.execute(select(Event))
-    return result.scalars().all()
+@cached_list_endpoint(
+    "/events", db_model=Event, pydantic_model=EventBase, ttl=300, stale=3600
+)
+async def list_events(
+    db: AsyncSession = Depends(get_read_session),
+    page: PageRequest = Depends(page_request),
+    fields: tuple[str, ...] | None = Depends(field_selection(EventBase)),
+):
+    return await paginate(db, select_fields(Event, EventBase, fields), Event.id, page)
 
 
 @cached_endpoint("/events/{event_id}", db_model=Event, pydantic_model=EventBase)
-async def read_event(event_id: int, db: AsyncSession = Depends(get_session)):
+async def read_event(event_id: int, db: AsyncSession = Depends(get_read_session)):
     result = await db.execute(select(Event).where(Event.id == event_id))
     return result.scalars().first()
 
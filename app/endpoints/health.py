@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Response, status
+
+from ..helpers.warmup import WarmupStatus, warmup
+
+router = APIRouter()
+
+
+@router.get("/live", description="The process is up and serving requests")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    response_model=WarmupStatus,
+    description="Warm-up progress; 503 until the local mirror has been loaded",
+    responses={503: {"model": WarmupStatus, "description": "Still warming up"}},
+)
+async def ready(response: Response):
+    current = warmup.status()
+    if not current.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return current
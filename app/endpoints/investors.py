@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db import get_session
+from ..db import get_read_session
 from ..helpers.caching_proxy import cached_endpoint, cached_list_endpoint, get_image
+from ..helpers.pagination import PageRequest, page_request, paginate
+from ..helpers.sparse_fields import field_selection, select_fields
 from ..jeb_schema import InvestorBase
 from ..models import Investor
 
@@ -11,15 +13,20 @@ router = APIRouter()
 
 
 @cached_list_endpoint("/investors", db_model=Investor, pydantic_model=InvestorBase)
-async def list_investors(db: AsyncSession = Depends(get_session)):
-    result = await db.execute(select(Investor))
-    return result.scalars().all()
+async def list_investors(
+    db: AsyncSession = Depends(get_read_session),
+    page: PageRequest = Depends(page_request),
+    fields: tuple[str, ...] | None = Depends(field_selection(InvestorBase)),
+):
+    return await paginate(
+        db, select_fields(Investor, InvestorBase, fields), Investor.id, page
+    )
 
 
 @cached_endpoint(
     "/investors/{investor_id}", db_model=Investor, pydantic_model=InvestorBase
 )
-async def read_investor(investor_id: int, db: AsyncSession = Depends(get_session)):
+async def read_investor(investor_id: int, db: AsyncSession = Depends(get_read_session)):
     result = await db.execute(select(Investor).where(Investor.id == investor_id))
     return result.scalars().first()
 
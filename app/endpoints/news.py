@@ -2,22 +2,29 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db import get_session
+from ..db import get_read_session
 from ..helpers.caching_proxy import cached_endpoint, cached_list_endpoint, get_image
+from ..helpers.pagination import PageRequest, page_request, paginate
+from ..helpers.sparse_fields import field_selection, select_fields
 from ..jeb_schema import NewsBase
 from ..models import News
 
 router = APIRouter()
 
 
-@cached_list_endpoint("/news", db_model=News, pydantic_model=NewsBase)
-async def list_news(db: AsyncSession = Depends(get_session)):
-    result = await db.execute(select(News))
-    return result.scalars().all()
+@cached_list_endpoint(
+    "/news", db_model=News, pydantic_model=NewsBase, ttl=120, stale=3600
+)
+async def list_news(
+    db: AsyncSession = Depends(get_read_session),
+    page: PageRequest = Depends(page_request),
+    fields: tuple[str, ...] | None = Depends(field_selection(NewsBase)),
+):
+    return await paginate(db, select_fields(News, NewsBase, fields), News.id, page)
 
 
 @cached_endpoint("/news/{news_id}", db_model=News, pydantic_model=NewsBase)
-async def read_news(news_id: int, db: AsyncSession = Depends(get_session)):
+async def read_news(news_id: int, db: AsyncSession = Depends(get_read_session)):
     result = await db.execute(select(News).where(News.id == news_id))
     return result.scalars().first()
 
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db import get_session
+from ..db import get_read_session
 from ..helpers.caching_proxy import cached_endpoint, cached_list_endpoint
+from ..helpers.pagination import PageRequest, page_request, paginate
+from ..helpers.sparse_fields import field_selection, select_fields
 from ..jeb_schema import PartnerBase
 from ..models import Partner
 
@@ -11,12 +13,17 @@ router = APIRouter()
 
 
 @cached_list_endpoint("/partners", db_model=Partner, pydantic_model=PartnerBase)
-async def list_partners(db: AsyncSession = Depends(get_session)):
-    result = await db.execute(select(Partner))
-    return result.scalars().all()
+async def list_partners(
+    db: AsyncSession = Depends(get_read_session),
+    page: PageRequest = Depends(page_request),
+    fields: tuple[str, ...] | None = Depends(field_selection(PartnerBase)),
+):
+    return await paginate(
+        db, select_fields(Partner, PartnerBase, fields), Partner.id, page
+    )
 
 
 @cached_endpoint("/partners/{partner_id}", db_model=Partner, pydantic_model=PartnerBase)
-async def read_partners(partner_id: int, db: AsyncSession = Depends(get_session)):
+async def read_partners(partner_id: int, db: AsyncSession = Depends(get_read_session)):
     result = await db.execute(select(Partner).where(Partner.id == partner_id))
     return result.scalars().first()
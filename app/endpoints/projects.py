@@ -14,9 +14,19 @@ from fastapi import (
 )
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from ..db import get_session
+from ..db import get_read_session, get_session
+from ..helpers.image_cache import image_cache
+from ..helpers.like_batcher import like_batcher
+from ..helpers.pagination import (
+    Page,
+    PageRequest,
+    page_request,
+    page_response,
+    paginate,
+)
+from ..helpers.response_cache import cached_response, response_cache
+from ..helpers.sparse_fields import field_selection, list_adapter, select_fields
 from ..jeb_schema import UserBase
 from ..models import Project
 from ..models.startups import Startup
@@ -26,6 +36,9 @@ from .auth import as_enough_perms, get_user_from_token, get_user_id_from_token
 
 router = APIRouter()
 
+# ProjectBase fields that are not named after their column.
+PROJECT_COLUMNS = {"nugget": Project.like_count}
+
 ALLOWED_IMAGE_TYPES = {
     "image/png",
     "image/jpeg",
@@ -70,20 +83,29 @@ def validate_image(logo: UploadFile | None):
         200: {"model": list[ProjectBase], "description": "List of projects"},
     },
 )
-async def list_project(db: AsyncSession = Depends(get_session)):
-    result = await db.execute(select(Project).options(selectinload(Project.liked_by)))
-    return [
-        ProjectBase(
-            logo=getattr(project, "logo"),
-            name=getattr(project, "name"),
-            description=getattr(project, "description"),
-            worth=getattr(project, "worth"),
-            nugget=len(project.liked_by),
-            id=getattr(project, "id"),
-            startup_id=getattr(project, "startup_id"),
-        )
-        for project in result.scalars().all()
-    ]
+async def list_project(
+    db: AsyncSession = Depends(get_read_session),
+    page: PageRequest = Depends(page_request),
+    fields: tuple[str, ...] | None = Depends(field_selection(ProjectBase)),
+):
+    return page_response(await list_project_page(db=db, page=page, fields=fields))
+
+
+@cached_response("projects")
+async def list_project_page(
+    db: AsyncSession, page: PageRequest, fields: tuple[str, ...] | None
+) -> Page:
+    projects = await paginate(
+        db,
+        select_fields(Project, ProjectBase, fields, PROJECT_COLUMNS),
+        Project.id,
+        page,
+    )
+    adapter = list_adapter(ProjectBase, projects.fields)
+    body = adapter.dump_json(
+        adapter.validate_python(projects.items, from_attributes=True)
+    )
+    return Page(body, projects.next_cursor)
 
 
 @router.get(
@@ -95,12 +117,9 @@ async def list_project(db: AsyncSession = Depends(get_session)):
         404: {"model": Message, "description": "Project not found"},
     },
 )
-async def read_project(project_id: int, db: AsyncSession = Depends(get_session)):
-    result = await db.execute(
-        select(Project)
-        .filter(Project.id == project_id)
-        .options(selectinload(Project.liked_by))
-    )
+@cached_response("projects")
+async def read_project(project_id: int, db: AsyncSession = Depends(get_read_session)):
+    result = await db.execute(select(Project).filter(Project.id == project_id))
     collected = result.scalars().first()
     if not collected:
         raise HTTPException(404, detail="Not Found")
@@ -110,7 +129,7 @@ async def read_project(project_id: int, db: AsyncSession = Depends(get_session))
         name=getattr(collected, "name"),
         description=getattr(collected, "description"),
         worth=getattr(collected, "worth"),
-        nugget=len(collected.liked_by),
+        nugget=getattr(collected, "like_count"),
         startup_id=getattr(collected, "startup_id"),
     )
 
@@ -125,7 +144,7 @@ async def read_project(project_id: int, db: AsyncSession = Depends(get_session))
     },
 )
 async def list_project_investors(
-    project_id: int, db: AsyncSession = Depends(get_session)
+    project_id: int, db: AsyncSession = Depends(get_read_session)
 ):
     result = await db.execute(
         select(Project).filter(Project.id == project_id).join(Project.investors)
@@ -173,6 +192,7 @@ async def create_project(
         with filepath.open("wb") as f:
             data = await logo.read()
             f.write(data)
+        await image_cache.record(filepath, pinned=True, db=db)
     project = Project(
         logo=str(filepath),
         name=name,
@@ -182,6 +202,7 @@ async def create_project(
     )
     db.add(project)
     await db.commit()
+    response_cache.invalidate("projects")
     return Message(message="Project successfully created")
 
 
@@ -214,16 +235,21 @@ async def update_project(
     if logo:
         if old_filepath:
             os.remove(getattr(project, "logo"))
+            await image_cache.forget(old_filepath, db=db)
         with new_filepath.open("wb") as f:
             data = await logo.read()
             f.write(data)
+        await image_cache.record(new_filepath, pinned=True, db=db)
         setattr(project, "logo", str(new_filepath))
     elif old_filepath:
         os.rename(old_filepath, new_filepath)
+        await image_cache.forget(old_filepath, db=db)
+        await image_cache.record(new_filepath, pinned=True, db=db)
         setattr(project, "logo", str(new_filepath))
     setattr(project, "name", name)
     setattr(project, "description", description)
     await db.commit()
+    response_cache.invalidate("projects")
     return Message(message="Project successfully updated")
 
 
@@ -264,11 +290,14 @@ async def patch_project(
         )
         if getattr(project, "logo"):
             os.remove(getattr(project, "logo"))
+            await image_cache.forget(getattr(project, "logo"), db=db)
         with new_filepath.open("wb") as f:
             data = await logo.read()
             f.write(data)
+        await image_cache.record(new_filepath, pinned=True, db=db)
         setattr(project, "logo", str(new_filepath))
     await db.commit()
+    response_cache.invalidate("projects")
     return Message(message="Project successfully updated")
 
 
@@ -294,8 +323,10 @@ async def delete_project(
     path = getattr(project, "logo")
     if path and Path(path).exists:
         os.remove(Path(path))
+        await image_cache.forget(path, db=db)
     await db.delete(project)
     await db.commit()
+    response_cache.invalidate("projects")
 
 
 @router.post(
@@ -310,26 +341,17 @@ async def delete_project(
 )
 async def like_project(
     project_id: int,
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
     authorization: str = Header(None),
 ) -> Message:
     user_id = get_user_id_from_token(authorization)
-    result = await db.execute(
-        select(User)
-        .filter(User.id == user_id)
-        .options(selectinload(User.liked_projects))
-    )
-    user = result.scalar()
-    if not user:
+    if await db.scalar(select(User.id).filter(User.id == user_id)) is None:
         raise HTTPException(404, "User not found")
-
-    result = await db.execute(select(Project).filter(Project.id == project_id))
-    project = result.scalar()
-    if not project:
+    if await db.scalar(select(Project.id).filter(Project.id == project_id)) is None:
         raise HTTPException(404, "Project not found")
+    # Do not hold a pooled connection while waiting for the batch.
+    await db.close()
 
-    if project in user.liked_projects:
+    if not await like_batcher.like(user_id, project_id):
         raise HTTPException(400, detail="Already liked")
-    user.liked_projects.append(project)
-    await db.commit()
     return Message(message="Project liked")
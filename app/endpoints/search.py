@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..crud.search import SEARCH_TARGETS, search
+from ..db import get_read_session
+from ..schemas.search import SearchHit, SearchKind
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_model=list[SearchHit],
+    description="Full-text search of startups, projects and news, best first. "
+    "Every word matches as a prefix.",
+)
+async def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: list[SearchKind] = Query(list(SEARCH_TARGETS)),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_session),
+):
+    return await search(db, q, kind, limit)
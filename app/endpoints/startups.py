@@ -5,9 +5,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud_startup
-from ..db import get_session
+from ..db import get_read_session, get_session
 from ..helpers.caching_proxy import cached_endpoint, cached_list_endpoint, get_image
-from ..jeb_schema import StartupBase
+from ..helpers.pagination import PageRequest, page_request
+from ..helpers.response_cache import response_cache
+from ..helpers.sparse_fields import field_selection
+from ..jeb_schema import StartupBase, StartupDetail
 from ..models import Startup
 from ..proxy_schema import Message
 from ..schemas.startup import StartupCreate, StartupOut, StartupUpdate
@@ -15,13 +18,25 @@ from ..schemas.startup import StartupCreate, StartupOut, StartupUpdate
 router = APIRouter(tags=["startups"])
 
 
-@cached_list_endpoint("/startups", db_model=Startup, pydantic_model=StartupBase)
-async def list_startup(db: AsyncSession = Depends(get_session), skip=0, limit=50):
-    return await crud_startup.get_startups(db, skip, limit)
+@cached_list_endpoint(
+    "/startups", db_model=Startup, pydantic_model=StartupBase, ttl=600, stale=86400
+)
+async def list_startup(
+    db: AsyncSession = Depends(get_read_session),
+    page: PageRequest = Depends(page_request),
+    fields: tuple[str, ...] | None = Depends(field_selection(StartupBase)),
+):
+    return await crud_startup.get_startups(db, page, fields)
 
 
-@cached_endpoint("/startups/{startup_id}", db_model=Startup, pydantic_model=StartupBase)
-async def read_startup(startup_id: int, db: AsyncSession = Depends(get_session)):
+@cached_endpoint(
+    "/startups/{startup_id}",
+    db_model=Startup,
+    pydantic_model=StartupDetail,
+    store=crud_startup.upsert_startup_details,
+    detail=True,
+)
+async def read_startup(startup_id: int, db: AsyncSession = Depends(get_read_session)):
     return await crud_startup.get_startup(db, startup_id)
 
 
@@ -46,7 +61,9 @@ async def create_startup(
     db: AsyncSession = Depends(get_session),
     authorization: str = Header(None),
 ):
-    return await crud_startup.create_startup(db, startup, authorization)
+    startup = await crud_startup.create_startup(db, startup, authorization)
+    response_cache.invalidate("startups")
+    return startup
 
 
 @router.put(
@@ -64,7 +81,9 @@ async def update_startup(
     db: AsyncSession = Depends(get_session),
     authorization: str = Header(None),
 ):
-    return await crud_startup.update_startup(db, startup_id, startup, authorization)
+    startup = await crud_startup.update_startup(db, startup_id, startup, authorization)
+    response_cache.invalidate("startups")
+    return startup
 
 
 @router.patch(
@@ -82,7 +101,9 @@ async def patch_startup(
     db: AsyncSession = Depends(get_session),
     authorization: str = Header(None),
 ):
-    return await crud_startup.update_startup(db, startup_id, startup, authorization)
+    startup = await crud_startup.update_startup(db, startup_id, startup, authorization)
+    response_cache.invalidate("startups")
+    return startup
 
 
 @router.delete(
@@ -99,3 +120,6 @@ async def delete_startup(
     authorization: str = Header(None),
 ):
     await crud_startup.delete_startup(db, startup_id, authorization)
+    # Founders and news of the startup are deleted along with it.
+    response_cache.invalidate("startups")
+    response_cache.invalidate("news")
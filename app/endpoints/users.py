@@ -11,8 +11,11 @@ from ..crud.users import (
     patch_user,
     update_user,
 )
-from ..db import get_session
+from ..db import get_read_session, get_session
 from ..helpers.caching_proxy import cached_endpoint, cached_list_endpoint, get_image
+from ..helpers.pagination import PageRequest, page_request
+from ..helpers.response_cache import response_cache
+from ..helpers.sparse_fields import field_selection
 from ..jeb_schema import UserBase
 from ..models import User
 from ..proxy_schema import Message
@@ -23,12 +26,18 @@ router = APIRouter()
 
 
 @cached_list_endpoint("/users", db_model=User, pydantic_model=UserBase)
-async def route_list_users(db: AsyncSession = Depends(get_session), skip=0, limit=100):
-    return await get_users(db, skip, limit)
+async def route_list_users(
+    db: AsyncSession = Depends(get_read_session),
+    page: PageRequest = Depends(page_request),
+    fields: tuple[str, ...] | None = Depends(field_selection(UserBase)),
+):
+    return await get_users(db, page, fields)
 
 
 @cached_endpoint("/users/{user_id}", db_model=User, pydantic_model=UserBase)
-async def route_read_user_by_id(user_id: int, db: AsyncSession = Depends(get_session)):
+async def route_read_user_by_id(
+    user_id: int, db: AsyncSession = Depends(get_read_session)
+):
     return await get_user(db, user_id)
 
 
@@ -40,7 +49,7 @@ async def route_get_user_image(
 
 @cached_endpoint("/users/email/{email}", db_model=User, pydantic_model=UserBase)
 async def route_read_user_by_mail(
-    email: EmailStr, db: AsyncSession = Depends(get_session)
+    email: EmailStr, db: AsyncSession = Depends(get_read_session)
 ):
     return await get_user_by_email(db, email)
 
@@ -118,4 +127,5 @@ async def route_assign_perm(
     setattr(user, "role", user_role)
     await db.commit()
     await db.refresh(user)
+    response_cache.invalidate("users")
     return user
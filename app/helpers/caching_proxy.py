@@ -1,124 +1,613 @@
+import asyncio
 import hashlib
+import inspect
 import logging
 import os
+import tempfile
+import time
+from email.utils import formatdate, parsedate_to_datetime
 from functools import wraps
 from http import HTTPStatus
 from pathlib import Path
+from typing import Literal
 
-import aiohttp
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
 from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
-from ..db import get_session
+from ..crud.bulk import upsert_rows
+from ..db import async_session, get_read_session, read_session
+from ..endpoints.auth import as_enough_perms, get_user_from_token
+from ..models import CacheFreshness
+from .circuit_breaker import CircuitBreaker, NegativeCache
+from .image_cache import image_cache
+from .image_variants import MAX_DIMENSION, ensure_variant
+from .like_batcher import like_batcher
+from .pagination import Page, page_response
+from .response_cache import MISS, resource_of, response_cache
+from .single_flight import SingleFlight
+from .sparse_fields import list_adapter
+from .upstream import get_client
+from .upstream_scheduler import Priority, priority, upstream_scheduler
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path("app/static/images")
 os.makedirs(CACHE_DIR, exist_ok=True)
+IMAGE_CHUNK_SIZE = 64 * 1024
+MEDIA_TYPES = {".png": "image/png", ".webp": "image/webp"}
 
+# Concurrent misses for the same upstream resource share a single fetch.
+upstream_flights = SingleFlight()
 
+
+# Upstream health, per endpoint template, and recently missing resources.
+upstream_breakers: dict[str, CircuitBreaker] = {}
+missing_resources = NegativeCache(settings.upstream_negative_ttl, max_entries=10_000)
+
+# Strong references to revalidation tasks so they are not garbage collected.
+background_refreshes: set[asyncio.Task] = set()
+
+
+def response_key(api_url: str, kwargs: dict) -> tuple:
+    """Keys a response by route and by every parameter, page and fields included."""
+    return (api_url, tuple(sorted(kwargs.items())))
+
+
+async def get_freshness_age(db: AsyncSession, *keys: str) -> float | None:
+    """Returns the age of the most recent fetch among `keys`."""
+    fetched_at = await db.scalar(
+        select(CacheFreshness.fetched_at)
+        .where(CacheFreshness.key.in_(keys))
+        .order_by(CacheFreshness.fetched_at.desc())
+        .limit(1)
+    )
+    if fetched_at is None:
+        return None
+    return time.time() - fetched_at
+
+
+async def mark_fresh(db: AsyncSession, *keys: str):
+    now = time.time()
+    stmt = insert(CacheFreshness)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["key"], set_={"fetched_at": stmt.excluded.fetched_at}
+        ),
+        [{"key": key, "fetched_at": now} for key in keys],
+    )
+
+
+def schedule_refresh(path: str, refresh):
+    """Runs `refresh` of the upstream `path` in the background, once."""
+    if path in upstream_flights:
+        return
+
+    async def run():
+        try:
+            await upstream_flights.do(path, refresh)
+        except Exception as e:
+            logger.error(f"Background refresh of {path} failed: {e}")
+
+    # The caller already has an answer: revalidate behind interactive calls.
+    with priority(Priority.SYNC):
+        task = asyncio.ensure_future(run())
+    background_refreshes.add(task)
+    task.add_done_callback(background_refreshes.discard)
+
+
+class UnusableResponse(Exception):
+    """An upstream answer this service refuses, which is no upstream failure."""
+
+    def __init__(self, detail: str, status: int = HTTPStatus.BAD_GATEWAY.value):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def get_breaker(api_url: str) -> CircuitBreaker:
+    breaker = upstream_breakers.get(api_url)
+    if breaker is None:
+        breaker = upstream_breakers[api_url] = CircuitBreaker(
+            settings.upstream_failure_threshold, settings.upstream_reset_timeout
+        )
+    return breaker
+
+
+def guard_upstream(fetch):
+    """
+    Applies the circuit breaker of `api_url` and the 404 cache to `fetch`.
+
+    Missing resources, calls to an endpoint whose breaker is open and every
+    call in offline mode are answered immediately, without touching the
+    network. Other calls then wait for an `upstream_scheduler` slot.
+    Connection errors and 5xx answers count as failures; an
+    `UnusableResponse` raised by `fetch` is answered with its status
+    without affecting the breaker.
+    """
+
+    @wraps(fetch)
+    async def wrapper(api_url: str, *args, **kwargs):
+        if settings.offline:
+            return (
+                {"detail": "External api disabled (offline mode)"},
+                HTTPStatus.SERVICE_UNAVAILABLE.value,
+            )
+
+        path = api_url.format(**kwargs)
+        if path in missing_resources:
+            return ({"detail": "Not Found"}, HTTPStatus.NOT_FOUND.value)
+
+        breaker = get_breaker(api_url)
+        if not breaker.allow():
+            return (
+                {"detail": "External api unavailable, retry later"},
+                HTTPStatus.SERVICE_UNAVAILABLE.value,
+            )
+
+        try:
+            async with upstream_scheduler.slot(api_url):
+                res, status = await fetch(api_url, *args, **kwargs)
+        except UnusableResponse as e:
+            breaker.abandon()
+            return {"detail": e.detail}, e.status
+        except BaseException:
+            breaker.abandon()
+            raise
+
+        if status >= HTTPStatus.INTERNAL_SERVER_ERROR.value:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if status == HTTPStatus.NOT_FOUND.value:
+            missing_resources.add(path)
+        return res, status
+
+    return wrapper
+
+
+@guard_upstream
 async def fetch_from_api(api_url: str, **kwargs):
     url = (settings.jeb_api_url + api_url).format(**kwargs)
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                url, headers={"X-Group-Authorization": settings.jeb_api_auth}
-            ) as response:
-                logger.debug("@" * 999)
-                match response.content_type:
-                    case "application/json":
-                        logger.debug(await response.json())
-                        return await response.json(), response.status
-                    case "image/png":
-                        data = await response.read()
-                        return data, response.status
-                    case _:
-                        return (None, 500)
+        async with get_client().get(url) as response:
+            match response.content_type:
+                case "application/json":
+                    return await response.json(), response.status
+                case "image/png":
+                    data = await response.read()
+                    return data, response.status
+                case _:
+                    raise UnusableResponse(
+                        f"Unexpected upstream content type {response.content_type}"
+                    )
+
+    except UnusableResponse:
+        raise
+    except Exception as e:
+        logger.error(e)
+        return (
+            {"detail": f"External api call fail: {e}"},
+            HTTPStatus.BAD_GATEWAY.value,
+        )
+
+
+@guard_upstream
+async def download_from_api(api_url: str, filepath: Path, **kwargs):
+    """
+    Streams an upstream image into `filepath` without buffering it in memory.
+
+    Chunks go to a temporary file next to `filepath`, written off the event
+    loop, which is then atomically renamed into place: a crash or an
+    oversized image never leaves a truncated cache entry behind.
+    """
+    url = (settings.jeb_api_url + api_url).format(**kwargs)
+    too_large = UnusableResponse(
+        f"Upstream image exceeds {settings.image_max_bytes} bytes"
+    )
+    try:
+        async with get_client().get(url) as response:
+            if response.content_type == "application/json":
+                return await response.json(), response.status
+            if response.content_type != "image/png":
+                raise UnusableResponse(
+                    f"Unexpected upstream content type {response.content_type}"
+                )
+            if response.status != HTTPStatus.OK.value:
+                return (None, response.status)
+            if (response.content_length or 0) > settings.image_max_bytes:
+                raise too_large
 
+            fd, tmp_path = await asyncio.to_thread(
+                tempfile.mkstemp, dir=filepath.parent, prefix=".", suffix=".part"
+            )
+            try:
+                size = 0
+                with os.fdopen(fd, "wb") as f:
+                    async for chunk in response.content.iter_chunked(IMAGE_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > settings.image_max_bytes:
+                            break
+                        await asyncio.to_thread(f.write, chunk)
+                if size > settings.image_max_bytes:
+                    await asyncio.to_thread(os.unlink, tmp_path)
+                    raise too_large
+                await asyncio.to_thread(os.replace, tmp_path, filepath)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            return None, response.status
+
+    except UnusableResponse:
+        raise
     except Exception as e:
         logger.error(e)
-        return ({"detail": f"External api call fail: {e}"}, 404)
+        return (
+            {"detail": f"External api call fail: {e}"},
+            HTTPStatus.BAD_GATEWAY.value,
+        )
+
+
+def remove_partial_downloads():
+    """Drops temporary files left behind by a process killed mid-download."""
+    for leftover in CACHE_DIR.glob(".*.part"):
+        leftover.unlink(missing_ok=True)
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+class HeldFileResponse(FileResponse):
+    """Sends a cached file, then lets the image cache evict it again."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            image_cache.release(self.path)
+
+
+def image_response(request: Request, filepath: Path) -> Response:
+    """
+    Serves a cached image with validators and a long-lived Cache-Control.
+
+    Cached files are only ever replaced atomically, so their path, mtime and
+    size identify the exact bytes and make a strong ETag. The file is held
+    in the image cache until it has been sent.
+
+    Raises:
+        FileNotFoundError: If the file was evicted since it was looked up.
+    """
+    image_cache.hold(filepath)
+    try:
+        stat = filepath.stat()
+    except BaseException:
+        image_cache.release(filepath)
+        raise
+    etag = f'"{filepath.stem}-{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": f"public, max-age={settings.image_max_age}",
+    }
+    if is_not_modified(request, etag, stat.st_mtime):
+        image_cache.release(filepath)
+        return Response(status_code=HTTPStatus.NOT_MODIFIED.value, headers=headers)
+    return HeldFileResponse(
+        filepath,
+        headers=headers,
+        media_type=MEDIA_TYPES.get(filepath.suffix),
+        stat_result=stat,
+    )
+
+
+IMAGE_PARAMETERS = (
+    inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+    inspect.Parameter(
+        "w",
+        inspect.Parameter.KEYWORD_ONLY,
+        annotation=int | None,
+        default=Query(None, ge=1, le=MAX_DIMENSION, description="Max width"),
+    ),
+    inspect.Parameter(
+        "h",
+        inspect.Parameter.KEYWORD_ONLY,
+        annotation=int | None,
+        default=Query(None, ge=1, le=MAX_DIMENSION, description="Max height"),
+    ),
+    inspect.Parameter(
+        "format",
+        inspect.Parameter.KEYWORD_ONLY,
+        annotation=Literal["png", "webp"] | None,
+        default=Query(None, description="Output format"),
+    ),
+)
+
+
+def with_image_parameters(func, wrapper):
+    """Exposes the route parameters of `func` plus `IMAGE_PARAMETERS`."""
+    signature = inspect.signature(func)
+    wrapper.__signature__ = signature.replace(
+        parameters=[*signature.parameters.values(), *IMAGE_PARAMETERS]
+    )
+    return wrapper
+
+
+def image_path(source_url: str) -> Path:
+    return CACHE_DIR / f"{hashlib.sha256(source_url.encode()).hexdigest()}.png"
+
+
+async def ensure_image(api_url: str, **kwargs) -> Path:
+    """
+    Returns the local copy of an upstream image, downloading it if needed.
+
+    Raises:
+        HTTPException: If the upstream did not return the image.
+    """
+    source_url = api_url.format(**kwargs)
+    filepath = image_path(source_url)
+    if filepath.exists():
+        return filepath
+
+    async def download():
+        # A flight that finished just before this one may have written it.
+        if filepath.exists():
+            return
+        res, status = await download_from_api(api_url, filepath, **kwargs)
+        if status != HTTPStatus.OK.value:
+            raise HTTPException(status, detail=res)
+        await image_cache.record(filepath, source_url=source_url)
+
+    await upstream_flights.do(filepath, download)
+    return filepath
 
 
 def get_image(api_url: str):
     def decorator(func):
         @wraps(func)
-        async def wrapper(**kwargs):
-            filepath = CACHE_DIR / (
-                f"{hashlib.sha256(api_url.format(**kwargs).encode()).hexdigest()}.png"
-            )
-            if filepath.exists():
-                return FileResponse(filepath)
-            res, status = await fetch_from_api(api_url, **kwargs)
-            if status != HTTPStatus.OK.value:
-                raise HTTPException(status, detail=res)
-            with open(filepath, "wb") as f:
-                if isinstance(res, bytes):
-                    f.write(res)
-                else:
-                    raise ValueError(
-                        "Expected 'res' to be of type 'bytes' for writing to file."
-                    )
+        async def wrapper(
+            request: Request,
+            w: int | None = None,
+            h: int | None = None,
+            format: str | None = None,
+            **kwargs,
+        ):
+            # Eviction may delete a file right after it was looked up; it is
+            # then downloaded again, once.
+            for attempt in (1, 2):
+                try:
+                    filepath = await ensure_image(api_url, **kwargs)
+                    if w or h or format:
+                        source_url = api_url.format(**kwargs)
+                        variant = await ensure_variant(
+                            filepath, w, h, format, source_url
+                        )
+                        return image_response(request, variant)
+                    image_cache.touch(filepath)
+                    return image_response(request, filepath)
+                except FileNotFoundError:
+                    if attempt == 2:
+                        raise
+                    logger.info(f"{api_url.format(**kwargs)} evicted, fetching again")
 
-            return FileResponse(filepath)
-
-        return router.get("/api" + api_url)(wrapper)
+        return router.get("/api" + api_url)(with_image_parameters(func, wrapper))
 
     return decorator
 
 
-def cached_endpoint_inner(api_url: str, convert_in, convert_out):
+@router.get("/api/cache/stats")
+async def cache_stats(
+    db: AsyncSession = Depends(get_read_session), authorization: str = Header(None)
+):
+    if not as_enough_perms("ADMIN", await get_user_from_token(db, authorization)):
+        raise HTTPException(403, "Not enough permissions")
+    return {
+        "responses": response_cache.stats(),
+        "images": image_cache.stats(),
+        "likes": like_batcher.stats(),
+        "upstream": {
+            "breakers": {
+                api_url: breaker.stats()
+                for api_url, breaker in upstream_breakers.items()
+            },
+            "missing": missing_resources.stats(),
+            "scheduler": upstream_scheduler.stats(),
+        },
+    }
+
+
+def as_response(value):
+    """Wraps pre-encoded JSON bodies, lets FastAPI serialize anything else."""
+    if isinstance(value, bytes):
+        return Response(content=value, media_type="application/json")
+    if isinstance(value, Page):
+        return page_response(value)
+    return value
+
+
+def upstream_error(res, status: int) -> HTTPException:
+    """Relays a failed upstream call that left nothing to serve locally."""
+    detail = res.get("detail") if isinstance(res, dict) else None
+    return HTTPException(status_code=status, detail=detail)
+
+
+def cached_endpoint_inner(
+    api_url: str,
+    convert_in,
+    convert_out,
+    ttl: int | None,
+    stale: int | None,
+    detail: bool = False,
+    paged: bool = False,
+):
+    """
+    Serves `func` results from the database and falls back to the JEB API.
+
+    `convert_out` may return the encoded JSON body as bytes, or a `Page` of
+    it, which is then cached and sent as is. A `detail` item carries fields
+    the collection listing lacks, so only a fetch of the item itself makes
+    it fresh. A `paged` func returns one `Page` of the collection: the
+    upstream sends the whole collection, which is stored before the
+    requested page is read back, and an empty page of a collection that
+    was already fetched is an answer rather than a miss.
+
+    Rows younger than `ttl` seconds are served as is. Rows older than that
+    but within the following `stale` seconds are served right away while a
+    background task refreshes them; older rows are refreshed before
+    answering, and are still served if the upstream call fails. Without
+    local rows, a failed upstream call is answered with its status.
+    """
+    ttl = settings.proxy_cache_ttl if ttl is None else ttl
+    stale = settings.proxy_cache_stale if stale is None else stale
+    resource = resource_of(api_url)
+    collection_keys = () if detail else (f"/{resource}",)
+
     def decorator(func):
         @wraps(func)
-        async def wrapper(db: AsyncSession = Depends(get_session), **kwargs):
+        async def wrapper(db: AsyncSession = Depends(get_read_session), **kwargs):
+            key = response_key(api_url, kwargs)
+            cached = response_cache.get(key)
+            if cached is not MISS:
+                return as_response(cached)
+
+            version = response_cache.version(resource)
             collected = await func(**kwargs, db=db)
+            freshness_key = api_url.format(**kwargs)
 
-            if collected:
-                return convert_out(collected)
+            async def fetch_and_store():
+                res, status = await fetch_from_api(api_url, **kwargs)
 
-            res, status = await fetch_from_api(api_url, **kwargs)
+                if status != HTTPStatus.OK.value:
+                    return res, status
 
-            if status != HTTPStatus.OK.value:
-                return res
+                # The fetch is shared between requests, so it must not borrow
+                # the session of whichever request happened to start it.
+                async with async_session() as session:
+                    items = await convert_in(session, res)
+                    await mark_fresh(session, freshness_key)
+                    await session.commit()
+                response_cache.invalidate(resource)
+                return items, status
+
+            async def refreshed():
+                # Requests for any page or fieldset share the upstream fetch,
+                # then each reads back its own page.
+                items, status = await upstream_flights.do(
+                    freshness_key, fetch_and_store
+                )
+                if paged and status == HTTPStatus.OK.value:
+                    async with read_session() as session:
+                        items = convert_out(await func(**kwargs, db=session))
+                return items, status
 
-            items = convert_in(db, res)
-            await db.commit()
-            return items
+            # A sync of the whole collection also refreshes its items.
+            age = await get_freshness_age(db, freshness_key, *collection_keys)
+            if (collected.items if paged else collected) or (paged and age is not None):
+                if age is not None and age < ttl:
+                    items = convert_out(collected)
+                    response_cache.put(key, resource, items, ttl - age, version)
+                    return as_response(items)
+                if age is None or age < ttl + stale:
+                    schedule_refresh(freshness_key, fetch_and_store)
+                    return as_response(convert_out(collected))
+
+                items, status = await refreshed()
+                if status != HTTPStatus.OK.value:
+                    logger.warning(
+                        f"Serving expired {freshness_key}: upstream {status}"
+                    )
+                    return as_response(convert_out(collected))
+                return as_response(items)
+
+            items, status = await refreshed()
+            if status != HTTPStatus.OK.value:
+                raise upstream_error(items, status)
+            return as_response(items)
 
         return router.get("/api" + api_url)(wrapper)
 
     return decorator
 
 
-def cached_list_endpoint(api_url: str, db_model, pydantic_model):
-    def convert_in(db, res):
-        items = []
-        for item in res:
-            model_instance = pydantic_model(**item)
-            items.append(model_instance)
-
-            db.add(db_model(**model_instance.model_dump()))
+def cached_list_endpoint(
+    api_url: str,
+    db_model,
+    pydantic_model,
+    ttl: int | None = None,
+    stale: int | None = None,
+):
+    payload_adapter = list_adapter(pydantic_model)
 
+    async def convert_in(db, res):
+        items = payload_adapter.validate_python(res)
+        await upsert_rows(db, db_model, (item.model_dump() for item in items))
         return items
 
-    def convert_out(collected):
-        return [
-            pydantic_model.model_validate(s, from_attributes=True) for s in collected
-        ]
+    def convert_out(page: Page) -> Page:
+        # Validated and encoded by pydantic-core in one pass; the bytes are
+        # what the response cache keeps, so hits skip all per-row work.
+        adapter = list_adapter(pydantic_model, page.fields)
+        body = adapter.dump_json(
+            adapter.validate_python(page.items, from_attributes=True)
+        )
+        return Page(body, page.next_cursor)
+
+    return cached_endpoint_inner(
+        api_url, convert_in, convert_out, ttl, stale, paged=True
+    )
+
 
-    return cached_endpoint_inner(api_url, convert_in, convert_out)
+def cached_endpoint(
+    api_url: str,
+    db_model,
+    pydantic_model,
+    ttl: int | None = None,
+    stale: int | None = None,
+    store=None,
+    detail: bool = False,
+):
+    """
+    Caches a single upstream item.
 
+    `store(db, items)` persists fetched items; by default they are upserted
+    into `db_model`. See `cached_endpoint_inner` for `detail`.
+    """
 
-def cached_endpoint(api_url: str, db_model, pydantic_model):
-    def convert_in(db, res):
+    async def convert_in(db, res):
         model_instance = pydantic_model(**res)
-        db.add(db_model(**model_instance.model_dump()))
+        if store is None:
+            await upsert_rows(db, db_model, [model_instance.model_dump()])
+        else:
+            await store(db, [model_instance])
         return model_instance
 
     def convert_out(collected):
         return pydantic_model.model_validate(collected, from_attributes=True)
 
-    return cached_endpoint_inner(api_url, convert_in, convert_out)
+    return cached_endpoint_inner(api_url, convert_in, convert_out, ttl, stale, detail)
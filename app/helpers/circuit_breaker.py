@@ -0,0 +1,119 @@
+import time
+from enum import Enum
+from typing import Callable
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream endpoint for a while.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    `allow` refuses calls. Once `reset_timeout` seconds have passed it lets
+    a single probe through (half-open): a success closes it again, a failure
+    re-opens it for another `reset_timeout`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        if self.state == BreakerState.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = BreakerState.HALF_OPEN
+
+        if self.state == BreakerState.HALF_OPEN:
+            if self.probing:
+                self.rejected += 1
+                return False
+            self.probing = True
+        return True
+
+    def record_success(self):
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.probing = False
+
+    def abandon(self):
+        """Releases the half-open probe slot of a call that never completed."""
+        self.probing = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.probing = False
+        if (
+            self.state == BreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != BreakerState.OPEN:
+                self.times_opened += 1
+            self.state = BreakerState.OPEN
+            self.opened_at = self.clock()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class NegativeCache:
+    """Remembers missing upstream resources for `ttl` seconds."""
+
+    def __init__(
+        self, ttl: float, max_entries: int, clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._expiries: dict[str, float] = {}
+        self.hits = 0
+
+    def __contains__(self, key: str) -> bool:
+        expires_at = self._expiries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= self.clock():
+            del self._expiries[key]
+            return False
+        self.hits += 1
+        return True
+
+    def add(self, key: str):
+        if len(self._expiries) >= self.max_entries:
+            now = self.clock()
+            self._expiries = {k: t for k, t in self._expiries.items() if t > now}
+            if len(self._expiries) >= self.max_entries:
+                del self._expiries[next(iter(self._expiries))]
+        self._expiries[key] = self.clock() + self.ttl
+
+    def discard(self, key: str):
+        self._expiries.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._expiries), "hits": self.hits}
+
+
+__all__ = ("BreakerState", "CircuitBreaker", "NegativeCache")
@@ -0,0 +1,245 @@
+import logging
+import mimetypes
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Content-Encoding -> file suffix, in order of preference.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+# Vite names build outputs assets/<name>-<content hash>.<ext>.
+HASHED_ASSET = re.compile(r"(^|/)assets/.+-[\w-]{8,}\.\w+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@lru_cache
+def get_brotli():
+    """Returns the optional brotli module, or None when it is not installed."""
+    try:
+        import brotli
+    except ImportError:
+        logger.warning("brotli is not installed, responses are only gzipped")
+        return None
+    return brotli
+
+
+def choose_encoding(accept_encoding: str, available: Iterable[str]) -> str | None:
+    """
+    Returns the preferred encoding of `available` that the client accepts.
+
+    Follows the q-values of Accept-Encoding; ties go to the earliest entry
+    of `available`. Returns None when the identity encoding must be used.
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int):
+        brotli = get_brotli()
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses text responses with brotli or gzip, as negotiated.
+
+    Bodies sent in one message are only compressed from `minimum_size`
+    bytes; streamed bodies always are. Responses that already have a
+    Content-Encoding (precompressed files), partial content and
+    non-text types (images) pass through untouched.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int, gzip_level: int, brotli_quality: int
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @property
+    def encodings(self) -> tuple[str, ...]:
+        return ("br", "gzip") if get_brotli() is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start: Message | None = None
+        encoder: GzipEncoder | BrotliEncoder | None = None
+
+        async def compressing_send(message: Message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                # Held back until the first body shows whether to compress.
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                first, start = start, None
+                headers = MutableHeaders(raw=first["headers"])
+                if not self.should_compress(first["status"], headers) or (
+                    not more_body and len(body) < self.minimum_size
+                ):
+                    await send(first)
+                    return await send(message)
+
+                encoder = self.encoder(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                body = encoder.compress(body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body += encoder.finish()
+                    headers["Content-Length"] = str(len(body))
+                await send(first)
+            elif encoder is None:
+                return await send(message)
+            else:
+                body = encoder.compress(body)
+                if not more_body:
+                    body += encoder.finish()
+            await send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, compressing_send)
+
+    def encoder(self, encoding: str) -> GzipEncoder | BrotliEncoder:
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    @staticmethod
+    def should_compress(status: int, headers: MutableHeaders) -> bool:
+        return (
+            status != 206
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+        )
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Serves `name.br` or `name.gz`, built next to `name`, to clients that
+    accept them; no compression happens while serving.
+
+    Hashed build outputs never change under the same name, so they are
+    cached for a year; everything else is revalidated with its ETag.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 206, 304):
+            hashed = HASHED_ASSET.search(path.replace(os.sep, "/"))
+            response.headers["Cache-Control"] = IMMUTABLE if hashed else "no-cache"
+        return response
+
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = os.fspath(full_path)
+        request_headers = Headers(scope=scope)
+        available = [
+            coding
+            for coding, suffix in ENCODINGS.items()
+            if os.path.isfile(full_path + suffix)
+        ]
+        encoding = choose_encoding(
+            request_headers.get("accept-encoding", ""), available
+        )
+        if encoding is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            if available:
+                response.headers.add_vary_header("Accept-Encoding")
+            return response
+
+        compressed = full_path + ENCODINGS[encoding]
+        response = FileResponse(
+            compressed,
+            status_code=status_code,
+            stat_result=os.stat(compressed),
+            media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+__all__ = (
+    "CompressionMiddleware",
+    "PrecompressedStaticFiles",
+    "choose_encoding",
+    "get_brotli",
+)
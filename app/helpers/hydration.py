@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from http import HTTPStatus
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import String, cast, literal, select
+
+from ..config import settings
+from ..crud.startup import upsert_startup_details
+from ..db import async_session, read_session
+from ..jeb_schema import StartupDetail
+from ..models import CacheFreshness, Startup
+from .caching_proxy import fetch_from_api, mark_fresh
+from .response_cache import response_cache
+from .upstream_scheduler import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+DETAIL_URL = "/startups/{startup_id}"
+
+
+class HydrationReport(BaseModel):
+    total: int = 0
+    hydrated: int = 0
+    failed: int = 0
+    seconds: float = 0
+
+
+async def list_unhydrated_startups() -> list[int]:
+    """
+    Returns the upstream startups whose detail was never fetched. Startups
+    created locally are unknown upstream and never listed.
+    """
+    detail_key = literal("/startups/") + cast(Startup.id, String)
+    async with read_session() as session:
+        return list(
+            await session.scalars(
+                select(Startup.id)
+                .where(
+                    Startup.upstream,
+                    ~select(CacheFreshness.id)
+                    .where(CacheFreshness.key == detail_key)
+                    .exists(),
+                )
+                .order_by(Startup.id)
+            )
+        )
+
+
+async def fetch_detail(startup_id: int) -> StartupDetail | None:
+    res, status = await fetch_from_api(DETAIL_URL, startup_id=startup_id)
+    if status != HTTPStatus.OK.value:
+        logger.warning(f"Hydration of startup {startup_id}: upstream {status}")
+        return None
+    try:
+        return StartupDetail.model_validate(res)
+    except ValidationError as e:
+        logger.warning(f"Hydration of startup {startup_id}: {e}")
+        return None
+
+
+async def hydrate_startups(batch_size: int | None = None) -> HydrationReport:
+    """
+    Fetches the detail of every startup only known from the listing.
+
+    Details are fetched concurrently, `batch_size` at a time, and each batch
+    is written with its founders in a single transaction. Startups that fail
+    are left for the next run.
+    """
+    batch_size = batch_size or settings.hydration_batch_size
+    start = time.perf_counter()
+    ids = await list_unhydrated_startups()
+    report = HydrationReport(total=len(ids))
+    if not ids:
+        return report
+
+    with priority(Priority.SYNC):
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i : i + batch_size]
+            details = [
+                detail
+                for detail in await asyncio.gather(*map(fetch_detail, batch))
+                if detail is not None
+            ]
+            report.failed += len(batch) - len(details)
+            if not details:
+                continue
+
+            async with async_session() as session:
+                await upsert_startup_details(session, details)
+                await mark_fresh(
+                    session,
+                    *(DETAIL_URL.format(startup_id=detail.id) for detail in details),
+                )
+                await session.commit()
+            report.hydrated += len(details)
+            response_cache.invalidate("startups")
+
+    report.seconds = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"Hydrated {report.hydrated}/{report.total} startups in {report.seconds}s "
+        f"({report.failed} failed)"
+    )
+    return report
+
+
+__all__ = ("HydrationReport", "hydrate_startups", "list_unhydrated_startups")
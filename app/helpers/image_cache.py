@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..db import async_session, read_session
+from ..models import ImageCacheEntry, Project
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path("app/static/images")
+# Evict down to this fraction of the budget so we do not evict on every miss.
+LOW_WATERMARK = 0.9
+
+
+@dataclass
+class CachedImage:
+    size: int
+    last_access: float
+    source_url: str | None = None
+    pinned: bool = False
+
+
+class ImageCache:
+    """
+    Byte-bounded index of the files stored in `CACHE_DIR`.
+
+    The index lives in memory and is persisted in the `image_cache_entry`
+    table. Access times are only tracked in memory and flushed periodically
+    by `run`, which also evicts the least recently used unpinned files once
+    the budget is exceeded. Pinned files (project logos) are never evicted,
+    nor are files held while a response is sending them.
+    """
+
+    def __init__(self, max_bytes: int, interval: float):
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._entries: dict[str, CachedImage] = {}
+        self._dirty: set[str] = set()
+        self._held: Counter[str] = Counter()
+        self._over_budget = asyncio.Event()
+        self.total_bytes = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    async def load(self):
+        """Loads the persisted index and adopts files it does not know yet."""
+        async with read_session() as session:
+            rows = (await session.scalars(select(ImageCacheEntry))).all()
+            logos = set((await session.scalars(select(Project.logo))).all())
+
+        self._entries = {
+            row.path: CachedImage(
+                size=row.size,
+                last_access=row.last_access,
+                source_url=row.source_url,
+                pinned=row.pinned,
+            )
+            for row in rows
+        }
+
+        on_disk = await asyncio.to_thread(self._scan)
+        stale = [path for path in self._entries if path not in on_disk]
+        for path in stale:
+            del self._entries[path]
+
+        adopted = []
+        for path, (size, mtime) in on_disk.items():
+            if path not in self._entries:
+                self._entries[path] = CachedImage(
+                    size=size, last_access=mtime, pinned=path in logos
+                )
+                adopted.append(path)
+
+        self.total_bytes = sum(entry.size for entry in self._entries.values())
+        async with async_session() as session:
+            if stale:
+                await session.execute(
+                    delete(ImageCacheEntry).where(ImageCacheEntry.path.in_(stale))
+                )
+            for path in adopted:
+                await self._persist(session, path)
+            await session.commit()
+
+        logger.info(
+            f"Image cache: {len(self._entries)} files, {self.total_bytes} bytes"
+        )
+        if self.total_bytes > self.max_bytes:
+            self._over_budget.set()
+
+    def touch(self, path: Path):
+        entry = self._entries.get(str(path))
+        if entry is not None:
+            entry.last_access = time.time()
+            self._dirty.add(str(path))
+
+    def hold(self, path: Path):
+        """Keeps `path` from being evicted until the matching `release`."""
+        self._held[str(path)] += 1
+
+    def release(self, path: Path):
+        self._held[str(path)] -= 1
+        if not self._held[str(path)]:
+            del self._held[str(path)]
+
+    async def record(
+        self,
+        path: Path,
+        source_url: str | None = None,
+        pinned: bool = False,
+        db: AsyncSession | None = None,
+    ):
+        """
+        Adds `path` to the index.
+
+        A caller holding the write connection passes its session as `db`; the
+        entry is then committed along with the caller's own changes.
+        """
+        size = (await asyncio.to_thread(os.stat, path)).st_size
+        previous = self._entries.get(str(path))
+        if previous is not None:
+            self.total_bytes -= previous.size
+        self._entries[str(path)] = CachedImage(
+            size=size, last_access=time.time(), source_url=source_url, pinned=pinned
+        )
+        self.total_bytes += size
+        self._dirty.discard(str(path))
+
+        if db is not None:
+            await self._persist(db, str(path))
+        else:
+            async with async_session() as session:
+                await self._persist(session, str(path))
+                await session.commit()
+
+        if self.total_bytes > self.max_bytes:
+            self._over_budget.set()
+
+    async def forget(self, path: Path | str, db: AsyncSession | None = None):
+        entry = self._entries.pop(str(path), None)
+        if entry is None:
+            return
+        self.total_bytes -= entry.size
+        self._dirty.discard(str(path))
+        stmt = delete(ImageCacheEntry).where(ImageCacheEntry.path == str(path))
+        if db is not None:
+            await db.execute(stmt)
+        else:
+            async with async_session() as session:
+                await session.execute(stmt)
+                await session.commit()
+
+    async def flush(self):
+        """Persists the access times gathered since the last flush."""
+        dirty = [path for path in self._dirty if path in self._entries]
+        self._dirty.clear()
+        if not dirty:
+            return
+        table = ImageCacheEntry.__table__
+        async with async_session() as session:
+            await session.execute(
+                update(table)
+                .where(table.c.path == bindparam("b_path"))
+                .values(last_access=bindparam("b_last_access")),
+                [
+                    {"b_path": path, "b_last_access": self._entries[path].last_access}
+                    for path in dirty
+                ],
+            )
+            await session.commit()
+
+    async def evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        target = self.max_bytes * LOW_WATERMARK
+        candidates = sorted(
+            (
+                (entry.last_access, path)
+                for path, entry in self._entries.items()
+                if not entry.pinned and path not in self._held
+            ),
+        )
+        evicted = []
+        for _, path in candidates:
+            if self.total_bytes <= target:
+                break
+            # Deletions yield: a file may have been held, or forgotten, since.
+            entry = self._entries.get(path)
+            if entry is None or entry.pinned or path in self._held:
+                continue
+            del self._entries[path]
+            await asyncio.to_thread(Path(path).unlink, missing_ok=True)
+            self.total_bytes -= entry.size
+            self.evicted_bytes += entry.size
+            evicted.append(path)
+
+        if not evicted:
+            return
+        self.evictions += len(evicted)
+        async with async_session() as session:
+            await session.execute(
+                delete(ImageCacheEntry).where(ImageCacheEntry.path.in_(evicted))
+            )
+            await session.commit()
+        logger.info(f"Image cache: evicted {len(evicted)} files")
+
+    async def run(self):
+        """Background loop flushing access times and enforcing the budget."""
+        while True:
+            try:
+                await asyncio.wait_for(self._over_budget.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._over_budget.clear()
+            try:
+                await self.flush()
+                await self.evict()
+            except Exception as e:
+                logger.error(f"Image cache maintenance failed: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "files": len(self._entries),
+            "pinned": sum(entry.pinned for entry in self._entries.values()),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+    async def _persist(self, session, path: str):
+        entry = self._entries[path]
+        values = {
+            "source_url": entry.source_url,
+            "size": entry.size,
+            "last_access": entry.last_access,
+            "pinned": entry.pinned,
+        }
+        stmt = insert(ImageCacheEntry).values(path=path, **values)
+        await session.execute(
+            stmt.on_conflict_do_update(index_elements=["path"], set_=values)
+        )
+
+    @staticmethod
+    def _scan() -> dict[str, tuple[int, float]]:
+        found = {}
+        for file in CACHE_DIR.iterdir():
+            if file.is_file() and not file.name.startswith("."):
+                stat = file.stat()
+                found[str(file)] = (stat.st_size, stat.st_mtime)
+        return found
+
+
+image_cache = ImageCache(settings.image_cache_max_bytes, settings.image_cache_interval)
+
+__all__ = ("ImageCache", "image_cache")
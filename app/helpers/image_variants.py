@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ..config import settings
+from .image_cache import image_cache
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+MAX_DIMENSION = 2048
+FORMATS = {"png": ("PNG", ".png"), "webp": ("WEBP", ".webp")}
+
+_pool: ProcessPoolExecutor | None = None
+variant_flights = SingleFlight()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned rather than forked: the server process runs threads
+        # (aiosqlite, to_thread) that must not be duplicated mid-flight.
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.image_variant_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def variant_path(
+    original: Path, width: int | None, height: int | None, fmt: str | None
+) -> Path:
+    extension = FORMATS[fmt][1] if fmt else original.suffix
+    return original.with_name(
+        f"{original.stem}.{width or ''}x{height or ''}{extension}"
+    )
+
+
+def render_variant(
+    source: str,
+    destination: str,
+    width: int | None,
+    height: int | None,
+    fmt: str | None,
+    quality: int,
+):
+    """
+    Resizes `source` to fit within `width`x`height` and writes `destination`.
+
+    Runs in a worker process. The aspect ratio is kept and images are never
+    upscaled; the result is written to a temporary file and renamed so a
+    variant is either complete or absent.
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.thumbnail((width or MAX_DIMENSION, height or MAX_DIMENSION))
+        pil_format = FORMATS[fmt][0] if fmt else image.format
+        if pil_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(destination), prefix=".", suffix=".part"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, format=pil_format, quality=quality, optimize=True)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+async def ensure_variant(
+    original: Path,
+    width: int | None,
+    height: int | None,
+    fmt: str | None,
+    source_url: str | None = None,
+) -> Path:
+    """Returns the path of the requested variant, rendering it at most once."""
+    destination = variant_path(original, width, height, fmt)
+    if destination.exists():
+        image_cache.touch(destination)
+        return destination
+
+    async def render():
+        if destination.exists():
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            get_pool(),
+            render_variant,
+            str(original),
+            str(destination),
+            width,
+            height,
+            fmt,
+            settings.image_variant_quality,
+        )
+        await image_cache.record(destination, source_url=source_url)
+
+    await variant_flights.do(destination, render)
+    return destination
+
+
+__all__ = ("MAX_DIMENSION", "ensure_variant", "shutdown_pool", "variant_path")
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import settings
+from ..db import async_session
+from ..models._many_to_many import user_likes
+from .response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+
+class LikeBatcher:
+    """
+    Coalesces project likes into batched write transactions.
+
+    `like` enqueues a (user, project) pair and waits for the transaction
+    that stores it: the answer is only given once the like is committed.
+    Pairs are deduplicated in memory, and `run` writes everything queued
+    every `interval` seconds, or as soon as `max_batch` pairs are waiting,
+    with a single INSERT OR IGNORE. When `run` is not active (shutdown,
+    scripts, tests) each `like` flushes the queue itself.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float,
+        max_batch: int,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_batch = max_batch
+        self.running = False
+        self._pending: dict[tuple[int, int], asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self._has_pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self.batches = 0
+        self.likes = 0
+
+    async def like(self, user_id: int, project_id: int) -> bool:
+        """Returns False if the user already liked the project."""
+        key = (user_id, project_id)
+        future = self._pending.get(key)
+        if future is not None:
+            # Same pair already queued: whichever came first gets the like.
+            await asyncio.shield(future)
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        if not self.running:
+            await self.flush()
+        return await asyncio.shield(future)
+
+    async def flush(self):
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            self._has_pending.clear()
+            self._full.clear()
+            if not pending:
+                return
+
+            try:
+                async with self.session_factory() as session:
+                    keys = list(pending)
+                    existing = set()
+                    # Chunked to stay under SQLite's bound parameter limit.
+                    for i in range(0, len(keys), self.max_batch):
+                        pairs = tuple_(user_likes.c.user_id, user_likes.c.project_id)
+                        existing.update(
+                            await session.execute(
+                                select(
+                                    user_likes.c.user_id, user_likes.c.project_id
+                                ).where(pairs.in_(keys[i : i + self.max_batch]))
+                            )
+                        )
+                    new = [key for key in keys if key not in existing]
+                    if new:
+                        await session.execute(
+                            user_likes.insert().prefix_with("OR IGNORE"),
+                            [
+                                {"user_id": user_id, "project_id": project_id}
+                                for user_id, project_id in new
+                            ],
+                        )
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Could not store {len(pending)} likes: {e}")
+                for future in pending.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            self.batches += 1
+            self.likes += len(new)
+            if new:
+                response_cache.invalidate("projects")
+            for key, future in pending.items():
+                if not future.done():
+                    future.set_result(key not in existing)
+
+    async def run(self):
+        self.running = True
+        try:
+            while True:
+                await self._has_pending.wait()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                # Shielded so that a shutdown never abandons a half-written batch.
+                await asyncio.shield(self.flush())
+        finally:
+            self.running = False
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "likes": self.likes,
+        }
+
+
+like_batcher = LikeBatcher(
+    async_session, settings.like_flush_interval, settings.like_batch_size
+)
+
+
+__all__ = ("LikeBatcher", "like_batcher")
@@ -1,9 +1,8 @@
 import logging
-import smtplib
-import ssl
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from functools import cache
 from pathlib import Path
 from typing import Sequence
 
@@ -12,7 +11,14 @@ from pydantic import BaseModel, field_validator
 from ..config import settings
 
 logger = logging.getLogger()
-context = ssl.create_default_context()
+
+
+@cache
+def get_ssl_context():
+    # Loading the system CA store is slow, only pay for it when mailing.
+    import ssl
+
+    return ssl.create_default_context()
 
 
 class EmailSchema(BaseModel):
@@ -64,11 +70,13 @@ async def send_email(
     hostname: tuple[str, int] = ("ms-mx-vct01.tuf.p.mcld.fr", 465),
     account: tuple[str, str] = (settings.mail_user, settings.mail_pass),
 ):
+    import smtplib
+
     message = create_mail_message(email, attachment_paths, content_type, account[0])
     logger.debug(f"Prepared email: {message.as_string()}")
     try:
         with smtplib.SMTP_SSL(
-            host=hostname[0], port=hostname[1], context=context
+            host=hostname[0], port=hostname[1], context=get_ssl_context()
         ) as server:
             try:
                 server.login(user=account[0], password=account[1])
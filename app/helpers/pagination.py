@@ -0,0 +1,114 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Any, NamedTuple, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ..config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageRequest(NamedTuple):
+    after: int | None
+    limit: int
+
+
+@dataclass(frozen=True)
+class Page:
+    """
+    One page of a collection, ordered by its key.
+
+    `items` are rows, or the JSON array once encoded. `next_cursor` is None
+    on the last page. `fields` names the columns of the rows when only some
+    columns were selected, and is None for ORM instances.
+    """
+
+    items: Sequence[Any] | bytes
+    next_cursor: str | None
+    fields: tuple[str, ...] | None = None
+
+
+def encode_cursor(key: int) -> str:
+    return base64.urlsafe_b64encode(f"k{key}".encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Raises:
+        HTTPException: If `cursor` was not produced by `encode_cursor`.
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        prefix, key = decoded[:1], int(decoded[1:])
+    except (binascii.Error, ValueError):
+        raise HTTPException(400, detail="Invalid cursor")
+    if prefix != b"k":
+        raise HTTPException(400, detail="Invalid cursor")
+    return key
+
+
+def page_request(
+    after: str | None = Query(
+        None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header"
+    ),
+    limit: int = Query(settings.page_size, ge=1, le=settings.max_page_size),
+) -> PageRequest:
+    return PageRequest(None if after is None else decode_cursor(after), limit)
+
+
+FIRST_PAGE = PageRequest(None, settings.page_size)
+
+
+def selects_entity(stmt: Select) -> bool:
+    """True for `select(Model)`, False for a select of columns."""
+    descriptions = stmt.column_descriptions
+    return (
+        len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]
+    )
+
+
+async def paginate(
+    db: AsyncSession, stmt: Select, key: InstrumentedAttribute, page: PageRequest
+) -> Page:
+    """
+    Returns the rows of `stmt` that come after the cursor, by ascending `key`.
+
+    `key` must be unique and indexed: seeking to the cursor then costs the
+    same on every page, where an OFFSET reads and drops every earlier row.
+    """
+    if page.after is not None:
+        stmt = stmt.where(key > page.after)
+    result = await db.execute(stmt.order_by(key).limit(page.limit + 1))
+    if selects_entity(stmt):
+        rows, fields = result.scalars().all(), None
+    else:
+        rows, fields = result.all(), tuple(result.keys())
+    if len(rows) <= page.limit:
+        return Page(rows, None, fields)
+    return Page(rows[: page.limit], encode_cursor(getattr(rows[-2], key.key)), fields)
+
+
+def page_response(page: Page) -> Response:
+    """Sends an encoded page, the body stays a plain JSON array."""
+    headers = {}
+    if page.next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return Response(content=page.items, media_type="application/json", headers=headers)
+
+
+__all__ = (
+    "FIRST_PAGE",
+    "NEXT_CURSOR_HEADER",
+    "Page",
+    "PageRequest",
+    "decode_cursor",
+    "encode_cursor",
+    "page_request",
+    "page_response",
+    "paginate",
+)
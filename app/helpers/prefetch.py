@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from ..config import settings
+from ..db import read_session
+from ..models import Event, Founder, Investor, News, User
+from .caching_proxy import ensure_image
+from .upstream_scheduler import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+# Image routes and the query yielding their path parameters, by label. Only
+# rows mirrored from upstream have an image there.
+IMAGE_SOURCES = (
+    (
+        "/events/{event_id}/image",
+        select(Event.id.label("event_id")).where(Event.upstream),
+    ),
+    (
+        "/investors/{investor_id}/image",
+        select(Investor.id.label("investor_id")).where(Investor.upstream),
+    ),
+    ("/news/{news_id}/image", select(News.id.label("news_id")).where(News.upstream)),
+    ("/users/{user_id}/image", select(User.id.label("user_id")).where(User.upstream)),
+    (
+        "/startups/{startup_id}/founders/{founder_id}/image",
+        select(
+            Founder.startup_id.label("startup_id"), Founder.id.label("founder_id")
+        ).where(Founder.upstream),
+    ),
+)
+
+
+class PrefetchFailure(BaseModel):
+    url: str
+    status: int
+    detail: str
+
+
+class PrefetchReport(BaseModel):
+    total: int = 0
+    fetched: int = 0
+    failed: int = 0
+    seconds: float = 0
+    failures: list[PrefetchFailure] = []
+
+
+async def list_image_jobs() -> list[tuple[str, dict]]:
+    async with read_session() as session:
+        return [
+            (api_url, dict(row._mapping))
+            for api_url, query in IMAGE_SOURCES
+            for row in (await session.execute(query)).all()
+        ]
+
+
+async def prefetch_images(concurrency: int | None = None) -> PrefetchReport:
+    """
+    Downloads every entity image that is not cached yet.
+
+    At most `concurrency` downloads run at once. Failures are collected in
+    the report instead of aborting the run.
+    """
+    concurrency = concurrency or settings.prefetch_concurrency
+    start = time.perf_counter()
+    jobs = await list_image_jobs()
+    report = PrefetchReport(total=len(jobs))
+    semaphore = asyncio.Semaphore(concurrency)
+    logger.info(f"Prefetching {len(jobs)} images ({concurrency} at a time)")
+
+    async def prefetch(api_url: str, params: dict):
+        async with semaphore:
+            try:
+                await ensure_image(api_url, **params)
+                report.fetched += 1
+            except HTTPException as e:
+                report.failed += 1
+                report.failures.append(
+                    PrefetchFailure(
+                        url=api_url.format(**params),
+                        status=e.status_code,
+                        detail=str(e.detail),
+                    )
+                )
+            except Exception as e:
+                report.failed += 1
+                report.failures.append(
+                    PrefetchFailure(
+                        url=api_url.format(**params), status=0, detail=str(e)
+                    )
+                )
+
+            done = report.fetched + report.failed
+            if done % 100 == 0 or done == report.total:
+                logger.info(f"Prefetch: {done}/{report.total} ({report.failed} failed)")
+
+    with priority(Priority.PREFETCH):
+        await asyncio.gather(*(prefetch(api_url, params) for api_url, params in jobs))
+    report.seconds = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"Prefetch done in {report.seconds}s: "
+        f"{report.fetched} cached, {report.failed} failed"
+    )
+    return report
+
+
+async def main():
+    from .image_cache import image_cache
+    from .upstream import close_client
+
+    await image_cache.load()
+    try:
+        report = await prefetch_images()
+    finally:
+        await image_cache.flush()
+        await close_client()
+    for failure in report.failures:
+        print(f"{failure.status} {failure.url}: {failure.detail}")
+    print(
+        f"{report.fetched}/{report.total} images cached, "
+        f"{report.failed} failed in {report.seconds}s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
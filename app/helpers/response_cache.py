@@ -0,0 +1,176 @@
+import sys
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Hashable
+
+from pydantic_core import PydanticSerializationError, to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from .pagination import Page
+
+MISS = object()
+
+
+def size_of(value: Any) -> int:
+    """
+    Bytes held by a cached value: the length of encoded bodies, and of the
+    JSON encoding of models and other values, measured once when cached.
+    """
+    if isinstance(value, Page):
+        value = value.items
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    try:
+        return len(to_json(value))
+    except PydanticSerializationError:
+        return sys.getsizeof(value)
+
+
+class ResponseCache:
+    """
+    In-process LRU of already validated responses, bounded both in entries
+    and in bytes: a handful of large list bodies cannot outgrow `max_bytes`.
+
+    Every entry belongs to a resource (e.g. "startups") so that writes can
+    drop everything derived from the rows they touched. Each write also bumps
+    the version of the resource: a response computed from rows read before
+    the write carries the old version and is not stored.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[float | None, str, Any, int]] = (
+            OrderedDict()
+        )
+        self._by_resource: dict[str, set[Hashable]] = {}
+        self._versions: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISS
+
+        expires_at, _, value, _ = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return MISS
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def version(self, resource: str) -> int:
+        return self._versions.get(resource, 0)
+
+    def put(
+        self,
+        key: Hashable,
+        resource: str,
+        value: Any,
+        ttl: float | None = None,
+        version: int | None = None,
+    ):
+        if version is not None and version != self.version(resource):
+            return
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        size = size_of(value)
+        if key in self._entries:
+            self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, resource, value, size)
+        self._by_resource.setdefault(resource, set()).add(key)
+        self.total_bytes += size
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, resource: str):
+        self._versions[resource] = self.version(resource) + 1
+        for key in self._by_resource.pop(resource, set()):
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[3]
+
+    def clear(self):
+        self._entries.clear()
+        self._by_resource.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict[str, int | None]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable):
+        _, resource, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+        keys = self._by_resource.get(resource)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_resource[resource]
+
+
+response_cache = ResponseCache(
+    settings.response_cache_max_entries, settings.response_cache_max_bytes
+)
+
+
+def resource_of(api_url: str) -> str:
+    """Returns the collection an upstream path belongs to: /news/{id} -> news."""
+    return api_url.strip("/").split("/")[0]
+
+
+def cached_response(resource: str):
+    """
+    Memoizes an endpoint in `response_cache` until `resource` is invalidated.
+
+    The request session is not part of the key, every other argument is.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(**kwargs):
+            key = (
+                func.__qualname__,
+                tuple(
+                    sorted(
+                        (k, v)
+                        for k, v in kwargs.items()
+                        if not isinstance(v, AsyncSession)
+                    )
+                ),
+            )
+            value = response_cache.get(key)
+            if value is MISS:
+                version = response_cache.version(resource)
+                value = await func(**kwargs)
+                response_cache.put(key, resource, value, version=version)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = ("MISS", "ResponseCache", "cached_response", "resource_of", "response_cache")
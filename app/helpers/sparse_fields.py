@@ -0,0 +1,87 @@
+from functools import lru_cache
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy import ColumnElement, Select, select
+
+
+def field_selection(pydantic_model: type[BaseModel]):
+    """
+    Returns a dependency reading `?fields=a,b` for lists of `pydantic_model`.
+
+    The dependency resolves to the requested field names in model order,
+    always including `id` (the pagination key), or None for every field.
+
+    Raises:
+        HTTPException: From the dependency, if a field is not in the model.
+    """
+    available = tuple(pydantic_model.model_fields)
+
+    def fields_parameter(
+        fields: str | None = Query(
+            None, description=f"Comma separated subset of: {', '.join(available)}"
+        ),
+    ) -> tuple[str, ...] | None:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",")} - {""}
+        unknown = requested.difference(available)
+        if unknown:
+            raise HTTPException(
+                400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        requested.add("id")
+        if len(requested) == len(available):
+            return None
+        return tuple(name for name in available if name in requested)
+
+    return fields_parameter
+
+
+def select_fields(
+    db_model,
+    pydantic_model: type[BaseModel],
+    fields: tuple[str, ...] | None,
+    columns: dict[str, ColumnElement] | None = None,
+) -> Select:
+    """
+    Selects only the columns behind `fields` (all of `pydantic_model` if None).
+
+    Rows come back as named tuples, which are cheaper to build than ORM
+    instances. `columns` maps fields that are not named after their column.
+    """
+    columns = columns or {}
+    selected = []
+    for name in fields or pydantic_model.model_fields:
+        column = columns[name] if name in columns else getattr(db_model, name)
+        selected.append(column.label(name))
+    return select(*selected)
+
+
+def list_adapter(
+    pydantic_model: type[BaseModel], fields: tuple[str, ...] | None = None
+) -> TypeAdapter:
+    """Validates and encodes lists of `pydantic_model` restricted to `fields`."""
+    if fields is not None and set(fields) == set(pydantic_model.model_fields):
+        fields = None
+    return cached_list_adapter(pydantic_model, fields)
+
+
+@lru_cache
+def cached_list_adapter(
+    pydantic_model: type[BaseModel], fields: tuple[str, ...] | None
+) -> TypeAdapter:
+    if fields is None:
+        return TypeAdapter(list[pydantic_model])
+    model = create_model(
+        f"{pydantic_model.__name__}Fields",
+        **{
+            name: (info.annotation, info)
+            for name, info in pydantic_model.model_fields.items()
+            if name in fields
+        },
+    )
+    return TypeAdapter(list[model])
+
+
+__all__ = ("field_selection", "list_adapter", "select_fields")
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import time
+from http import HTTPStatus
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from ..config import settings
+from ..crud.bulk import upsert_rows
+from ..db import async_session, read_session
+from ..jeb_schema import (
+    EventBase,
+    InvestorBase,
+    NewsBase,
+    PartnerBase,
+    StartupBase,
+    UserBase,
+)
+from ..models import Event, Investor, News, Partner, Startup, SyncWatermark, User
+from .caching_proxy import fetch_from_api, get_freshness_age, mark_fresh
+from .response_cache import resource_of, response_cache
+from .upstream_scheduler import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+# Upstream collections mirrored into the local database.
+COLLECTIONS = {
+    "/events": (Event, EventBase),
+    "/investors": (Investor, InvestorBase),
+    "/news": (News, NewsBase),
+    "/partners": (Partner, PartnerBase),
+    "/startups": (Startup, StartupBase),
+    "/users": (User, UserBase),
+}
+
+
+class SyncResult(BaseModel):
+    collection: str
+    status: int
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    seconds: float = 0
+
+
+async def sync_collection(api_url: str, db_model, pydantic_model) -> SyncResult:
+    """
+    Mirrors one upstream collection into its table.
+
+    Only rows that differ from the local copy are written. Rows created
+    locally (registered users, admin-created startups) are never written
+    nor deleted: an upstream row taking their id or email is skipped. A
+    mirrored row is deleted when the previous sync saw it upstream and this
+    one does not.
+    """
+    start = time.perf_counter()
+    res, status = await fetch_from_api(api_url)
+    result = SyncResult(collection=api_url, status=status)
+    if status != HTTPStatus.OK.value:
+        logger.warning(f"Sync of {api_url} skipped: upstream answered {status}")
+        return result
+
+    items = TypeAdapter(list[pydantic_model]).validate_python(res)
+    upstream = {item.id: item.model_dump() for item in items}
+    table = db_model.__table__
+    columns = [table.c[name] for name in pydantic_model.model_fields]
+
+    async with async_session() as session:
+        local = {
+            row.id: dict(row._mapping)
+            for row in (
+                await session.execute(select(*columns).where(table.c.upstream))
+            ).all()
+        }
+        previous_ids = set(
+            json.loads(
+                await session.scalar(
+                    select(SyncWatermark.upstream_ids).where(
+                        SyncWatermark.collection == api_url
+                    )
+                )
+                or "[]"
+            )
+        )
+
+        inserted = [row for id, row in upstream.items() if id not in local]
+        updated = [
+            row for id, row in upstream.items() if id in local and local[id] != row
+        ]
+        gone = (previous_ids - upstream.keys()) & local.keys()
+
+        written = {
+            row["id"]
+            for row in await upsert_rows(session, db_model, inserted + updated)
+        }
+        inserted = [row for row in inserted if row["id"] in written]
+        updated = [row for row in updated if row["id"] in written]
+        if gone:
+            # Through the ORM so relationship cascades (founders, news) apply.
+            for row in await session.scalars(
+                select(db_model).where(db_model.id.in_(gone))
+            ):
+                await session.delete(row)
+
+        watermark = {
+            "synced_at": time.time(),
+            "upstream_ids": json.dumps(sorted(upstream)),
+            "inserted": len(inserted),
+            "updated": len(updated),
+            "deleted": len(gone),
+        }
+        stmt = insert(SyncWatermark).values(collection=api_url, **watermark)
+        await session.execute(
+            stmt.on_conflict_do_update(index_elements=["collection"], set_=watermark)
+        )
+        await mark_fresh(session, api_url)
+        await session.commit()
+
+    if inserted or updated or gone:
+        response_cache.invalidate(resource_of(api_url))
+
+    result.inserted = len(inserted)
+    result.updated = len(updated)
+    result.deleted = len(gone)
+    result.seconds = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"Synced {api_url} in {result.seconds}s: +{result.inserted} "
+        f"~{result.updated} -{result.deleted}"
+    )
+    return result
+
+
+async def sync_all(
+    concurrency: int | None = None, skip_fresher_than: float | None = None
+) -> list[SyncResult]:
+    """
+    Syncs every collection, `concurrency` at a time. Collections fetched
+    less than `skip_fresher_than` seconds ago, by the warm-up or a cached
+    endpoint, are left out.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.sync_concurrency)
+    collections = COLLECTIONS
+    if skip_fresher_than is not None:
+        async with read_session() as session:
+            ages = {
+                api_url: await get_freshness_age(session, api_url)
+                for api_url in COLLECTIONS
+            }
+        collections = {
+            api_url: models
+            for api_url, models in COLLECTIONS.items()
+            if ages[api_url] is None or ages[api_url] >= skip_fresher_than
+        }
+
+    async def run(api_url: str, db_model, pydantic_model):
+        async with semaphore:
+            try:
+                return await sync_collection(api_url, db_model, pydantic_model)
+            except Exception as e:
+                logger.error(f"Sync of {api_url} failed: {e}")
+                return SyncResult(
+                    collection=api_url, status=HTTPStatus.INTERNAL_SERVER_ERROR
+                )
+
+    with priority(Priority.SYNC):
+        return await asyncio.gather(
+            *(run(api_url, *models) for api_url, models in collections.items())
+        )
+
+
+async def run_sync_loop():
+    """
+    Keeps the local mirror in sync, every `settings.sync_interval` seconds.
+
+    The first pass skips the collections the warm-up has just fetched.
+    """
+    from .hydration import hydrate_startups
+
+    skip_fresher_than = settings.sync_interval
+    while True:
+        await sync_all(skip_fresher_than=skip_fresher_than)
+        skip_fresher_than = None
+        try:
+            await hydrate_startups()
+        except Exception as e:
+            logger.error(f"Startup hydration failed: {e}")
+        await asyncio.sleep(settings.sync_interval)
+
+
+__all__ = ("COLLECTIONS", "SyncResult", "run_sync_loop", "sync_all", "sync_collection")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_client: aiohttp.ClientSession | None = None
+
+
+def _build_client() -> aiohttp.ClientSession:
+    # Imported on first use: aiohttp is heavy and only needed on a cache miss.
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=settings.upstream_connection_limit,
+        limit_per_host=settings.upstream_connection_limit_per_host,
+        keepalive_timeout=settings.upstream_keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=settings.upstream_dns_cache_ttl,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.upstream_total_timeout,
+        connect=settings.upstream_connect_timeout,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"X-Group-Authorization": settings.jeb_api_auth},
+    )
+
+
+def get_client() -> aiohttp.ClientSession:
+    """
+    Returns the shared upstream HTTP client, creating it on first use.
+
+    The client keeps its connections alive between calls, so cache misses
+    reuse an already established TCP/TLS connection to the JEB API.
+    """
+    global _client
+    if _client is None or _client.closed:
+        _client = _build_client()
+        logger.info(
+            f"Upstream client ready (limit={settings.upstream_connection_limit}, "
+            f"per host={settings.upstream_connection_limit_per_host})"
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None and not _client.closed:
+        await _client.close()
+    _client = None
+
+
+__all__ = ("get_client", "close_client")
@@ -0,0 +1,170 @@
+import asyncio
+import bisect
+import itertools
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable
+
+from ..config import settings
+
+
+class Priority(IntEnum):
+    """Upstream call classes, lowest value served first."""
+
+    INTERACTIVE = 0
+    SYNC = 1
+    PREFETCH = 2
+
+
+current_priority: ContextVar[Priority] = ContextVar(
+    "upstream_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def priority(value: Priority):
+    """Runs upstream calls made within the block, and tasks it spawns, at `value`."""
+    token = current_priority.set(value)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, `burst` at once.
+
+    Waiters are served in arrival order. A `rate` of 0 disables the limit.
+    """
+
+    def __init__(
+        self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated_at = clock()
+        self.throttled = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                self.throttled += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class UpstreamScheduler:
+    """
+    Bounds concurrent upstream calls, globally and per endpoint template.
+
+    Calls over either cap wait in a queue ordered by priority, then arrival.
+    When a slot frees up, the first waiter whose route is under its cap gets
+    it, so a saturated route does not hold back calls to the others. Every
+    call also takes a token from `bucket` before it goes out.
+    """
+
+    def __init__(self, max_concurrency: int, max_per_route: int, bucket: TokenBucket):
+        self.max_concurrency = max_concurrency
+        self.max_per_route = max_per_route
+        self.bucket = bucket
+        self.active = 0
+        self._per_route: Counter[str] = Counter()
+        self._waiters: list[tuple[int, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.completed: Counter[str] = Counter()
+        self.queued: Counter[str] = Counter()
+
+    def _grant(self, route: str):
+        self.active += 1
+        self._per_route[route] += 1
+
+    def _release(self, route: str):
+        self.active -= 1
+        self._per_route[route] -= 1
+        if not self._per_route[route]:
+            del self._per_route[route]
+        self._dispatch()
+
+    def _dispatch(self):
+        i = 0
+        while i < len(self._waiters) and self.active < self.max_concurrency:
+            _, _, route, future = self._waiters[i]
+            if self._per_route[route] >= self.max_per_route:
+                i += 1
+                continue
+            del self._waiters[i]
+            self._grant(route)
+            future.set_result(None)
+
+    async def _acquire(self, route: str, level: Priority):
+        future = asyncio.get_running_loop().create_future()
+        waiter = (level, next(self._sequence), route, future)
+        bisect.insort(self._waiters, waiter, key=lambda w: w[:2])
+        self._dispatch()
+        if future.done():
+            return
+
+        self.queued[level.name] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(route)
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    @asynccontextmanager
+    async def slot(self, route: str, level: Priority | None = None):
+        level = current_priority.get() if level is None else level
+        await self._acquire(route, level)
+        try:
+            await self.bucket.acquire()
+            yield
+        finally:
+            self.completed[level.name] += 1
+            self._release(route)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_per_route": self.max_per_route,
+            "queued": dict(self.queued),
+            "completed": dict(self.completed),
+            "throttled": self.bucket.throttled,
+        }
+
+
+upstream_scheduler = UpstreamScheduler(
+    settings.upstream_max_concurrency,
+    settings.upstream_max_per_route,
+    TokenBucket(settings.upstream_rate_limit, settings.upstream_rate_burst),
+)
+
+
+__all__ = (
+    "Priority",
+    "TokenBucket",
+    "UpstreamScheduler",
+    "current_priority",
+    "priority",
+    "upstream_scheduler",
+)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from enum import Enum
+from http import HTTPStatus
+
+from pydantic import BaseModel
+
+from ..db import read_session
+from .pagination import FIRST_PAGE
+
+logger = logging.getLogger(__name__)
+
+
+class StepState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class WarmupStatus(BaseModel):
+    ready: bool
+    offline: bool
+    steps: dict[str, StepState]
+    done: int
+    total: int
+    startup_seconds: float | None
+    warmup_seconds: float | None
+
+
+def list_handlers() -> dict:
+    from ..endpoints.events import list_events
+    from ..endpoints.investors import list_investors
+    from ..endpoints.news import list_news
+    from ..endpoints.partners import list_partners
+    from ..endpoints.startups import list_startup
+    from ..endpoints.users import route_list_users
+
+    return {
+        "users": route_list_users,
+        "startups": list_startup,
+        "events": list_events,
+        "news": list_news,
+        "partners": list_partners,
+        "investors": list_investors,
+    }
+
+
+def check_result(result):
+    """
+    Raises:
+        RuntimeError: If a list handler answered with an error rather than
+            raising it: a non-2xx response or an error body.
+    """
+    status = getattr(result, "status_code", HTTPStatus.OK.value)
+    if not 200 <= status < 300:
+        raise RuntimeError(f"answered {status}")
+    if isinstance(result, dict) and "detail" in result:
+        raise RuntimeError(f"answered {result['detail']}")
+
+
+class Warmup:
+    """
+    Fills the local mirror of the JEB API in the background.
+
+    Each collection is loaded through its list endpoint, which only calls
+    upstream when the local copy is missing or too old, so restarting on a
+    populated database costs no upstream call. Failures are recorded and
+    left to the sync loop; they never block the app from serving.
+    """
+
+    def __init__(self):
+        self.steps: dict[str, StepState] = {}
+        self.offline = False
+        self.started_at: float | None = None
+        self.startup_seconds: float | None = None
+        self.warmup_seconds: float | None = None
+        self.finished = asyncio.Event()
+
+    def serving(self, started_at: float):
+        """Records how long the app took to start accepting requests."""
+        self.startup_seconds = round(time.perf_counter() - started_at, 3)
+        logger.info(f"Serving {self.startup_seconds}s after startup began")
+
+    def skip(self):
+        self.offline = True
+        self.steps = {name: StepState.SKIPPED for name in list_handlers()}
+        self.finished.set()
+        logger.info("Offline: serving the local database, upstream is never called")
+
+    async def run_step(self, name: str, handler):
+        self.steps[name] = StepState.RUNNING
+        try:
+            async with read_session() as session:
+                check_result(await handler(session, page=FIRST_PAGE, fields=None))
+            self.steps[name] = StepState.DONE
+        except Exception as e:
+            self.steps[name] = StepState.FAILED
+            logger.error(f"Warm-up of {name} failed: {e}")
+
+    async def run(self):
+        handlers = list_handlers()
+        self.steps = {name: StepState.PENDING for name in handlers}
+        self.started_at = time.perf_counter()
+        try:
+            await asyncio.gather(
+                *(self.run_step(name, handler) for name, handler in handlers.items())
+            )
+        finally:
+            self.warmup_seconds = round(time.perf_counter() - self.started_at, 3)
+            self.finished.set()
+        failed = [
+            name for name, state in self.steps.items() if state == StepState.FAILED
+        ]
+        logger.info(
+            f"Warm-up done in {self.warmup_seconds}s"
+            + (f", failed: {', '.join(failed)}" if failed else "")
+        )
+
+    def status(self) -> WarmupStatus:
+        return WarmupStatus(
+            ready=self.finished.is_set(),
+            offline=self.offline,
+            steps=self.steps,
+            done=sum(
+                state in (StepState.DONE, StepState.FAILED)
+                for state in self.steps.values()
+            ),
+            total=len(self.steps),
+            startup_seconds=self.startup_seconds,
+            warmup_seconds=self.warmup_seconds,
+        )
+
+
+warmup = Warmup()
+
+
+__all__ = ("StepState", "Warmup", "WarmupStatus", "warmup")
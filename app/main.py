@@ -1,10 +1,11 @@
 from http import HTTPStatus
-import uvicorn
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+import asyncio
 import os
 import logging
 import sys
+import time
 from contextlib import asynccontextmanager
 
 from starlette.responses import FileResponse, JSONResponse
@@ -13,15 +14,75 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from . import endpoints
-from .db import init_db
+from .config import settings
+from .db import close_db, init_db, seed_admin
+from .helpers.caching_proxy import remove_partial_downloads
+from .helpers.compression import CompressionMiddleware, PrecompressedStaticFiles
+from .helpers.image_cache import image_cache
+from .helpers.image_variants import shutdown_pool
+from .helpers.like_batcher import like_batcher
+from .helpers.pagination import NEXT_CURSOR_HEADER
+from .helpers.prefetch import prefetch_images
+from .helpers.sync import run_sync_loop
+from .helpers.upstream import close_client, get_client
+from .helpers.warmup import warmup
 
 logger = logging.getLogger(__name__)
 
 
+async def refresh_in_background():
+    """Warms the local mirror, then keeps it up to date."""
+    await warmup.run()
+    try:
+        await seed_admin()
+    except Exception as e:
+        logger.error(f"Admin seeding failed: {e}")
+    jobs = []
+    if settings.sync_enabled:
+        jobs.append(run_sync_loop())
+    if settings.prefetch_images_on_startup:
+        jobs.append(prefetch_images())
+    await asyncio.gather(*jobs)
+
+
+def log_routes(app: FastAPI):
+    data = sorted(app.routes, key=lambda r: r.path)
+    for route in data:
+        if hasattr(route, "methods"):
+            methods = ", ".join(route.methods)
+            logger.info(f"{methods:>10} -> {route.path}")
+
+
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
+    started_at = time.perf_counter()
+    log_routes(app)
+    remove_partial_downloads()
     await init_db()
-    yield
+    await image_cache.load()
+    background_tasks = [
+        asyncio.create_task(image_cache.run()),
+        asyncio.create_task(like_batcher.run()),
+    ]
+    if settings.offline:
+        warmup.skip()
+        await seed_admin()
+    else:
+        get_client()
+        background_tasks.append(asyncio.create_task(refresh_in_background()))
+    warmup.serving(started_at)
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        # Let cancelled tasks roll back their writes before the engines go.
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await like_batcher.flush()
+        await image_cache.flush()
+        shutdown_pool()
+        await close_client()
+        await close_db()
 
 
 app = FastAPI(lifespan=lifespan, redoc_url="/api/doc", docs_url=None)
@@ -33,22 +94,21 @@ if "dev" in sys.argv:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 else:
-    app.mount("/", StaticFiles(directory="front/dist", html=True), name="dist")
-
-endpoints.register_all(app)
-
-
-def log_routes(app: FastAPI):
-    data = sorted(app.routes, key=lambda r: r.path)
-    for route in data:
-        if hasattr(route, "methods"):
-            methods = ", ".join(route.methods)
-            logger.info(f"{methods:>10} -> {route.path}")
+    app.mount(
+        "/", PrecompressedStaticFiles(directory="front/dist", html=True), name="dist"
+    )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
 
-log_routes(app)
+endpoints.register_all(app)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -72,6 +132,8 @@ async def custom_404_handler(request, exc: StarletteHTTPException):
 
 
 def main():
+    import uvicorn
+
     uvicorn.run(app, host="127.0.0.1", port=8000)
 
 
@@ -0,0 +1,182 @@
+from logging import getLogger
+from typing import Callable
+
+from sqlalchemy import Connection
+
+logger = getLogger(__name__)
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def add_lookup_indexes(conn: Connection):
+    duplicates = conn.exec_driver_sql(
+        "SELECT lower(email) FROM user GROUP BY lower(email) HAVING count(*) > 1"
+    ).all()
+    if duplicates:
+        raise MigrationError(
+            "Cannot add the unique email index, these emails are used by "
+            f"several users: {', '.join(email for email, in duplicates)}"
+        )
+
+    for statement in (
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_user_email "
+        "ON user (email COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS ix_project_startup_id ON project (startup_id)",
+        "CREATE INDEX IF NOT EXISTS ix_news_startup_id ON news (startup_id)",
+        "CREATE INDEX IF NOT EXISTS ix_founder_startup_id ON founder (startup_id)",
+        "CREATE INDEX IF NOT EXISTS ix_user_likes_user_id ON user_likes (user_id)",
+    ):
+        conn.exec_driver_sql(statement)
+
+
+def add_project_like_count(conn: Connection):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(project)")}
+    if "like_count" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE project ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0"
+        )
+    conn.exec_driver_sql(
+        "UPDATE project SET like_count = "
+        "(SELECT count(*) FROM user_likes WHERE project_id = project.id)"
+    )
+    # Every path that adds or removes a like, including ORM cascades when a
+    # user or project is deleted, keeps the counter in the same transaction.
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS user_likes_count_insert "
+        "AFTER INSERT ON user_likes BEGIN "
+        "UPDATE project SET like_count = like_count + 1 WHERE id = NEW.project_id; "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS user_likes_count_delete "
+        "AFTER DELETE ON user_likes BEGIN "
+        "UPDATE project SET like_count = like_count - 1 WHERE id = OLD.project_id; "
+        "END"
+    )
+
+
+# Full-text index name -> (indexed table, indexed columns).
+SEARCH_INDEXES = {
+    "startup_fts": ("startup", ("name", "description", "needs", "sector")),
+    "project_fts": ("project", ("name", "description")),
+    "news_fts": ("news", ("title", "description")),
+}
+
+
+def add_search_index(conn: Connection):
+    options = {row[0] for row in conn.exec_driver_sql("PRAGMA compile_options")}
+    if "ENABLE_FTS5" not in options:
+        raise MigrationError("Full-text search needs SQLite built with FTS5")
+
+    for index, (table, columns) in SEARCH_INDEXES.items():
+        names = ", ".join(columns)
+        new = ", ".join(f"new.{column}" for column in columns)
+        old = ", ".join(f"old.{column}" for column in columns)
+        changed = " OR ".join(
+            f"old.{column} IS NOT new.{column}" for column in ("id", *columns)
+        )
+        # External content: the index stores tokens only, the text stays in
+        # `table`. Prefix indexes make 2 and 3 character prefixes cheap.
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"{names}, content='{table}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        # Every write path, including upserts from the JEB API and ORM
+        # cascades, goes through these. Syncs rewrite unchanged rows and
+        # likes update like_count: neither touches the index.
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} "
+            f"BEGIN INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new}); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} "
+            f"BEGIN INSERT INTO {index} ({index}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old}); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_update "
+            f"AFTER UPDATE OF id, {names} ON {table} WHEN {changed} BEGIN "
+            f"INSERT INTO {index} ({index}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new}); END"
+        )
+        conn.exec_driver_sql(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+# Upstream collection -> table mirroring it (see app.helpers.sync).
+MIRRORED_TABLES = {
+    "/events": "event",
+    "/investors": "investor",
+    "/news": "news",
+    "/partners": "partner",
+    "/startups": "startup",
+    "/users": "user",
+}
+
+
+def add_upstream_provenance(conn: Connection):
+    for table in (*MIRRORED_TABLES.values(), "founder"):
+        columns = {
+            row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")
+        }
+        if "upstream" not in columns:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN upstream BOOLEAN NOT NULL DEFAULT 0"
+            )
+
+    # Rows seen by the last sync, or fetched through their detail endpoint,
+    # came from the JEB API. Everything else is kept as created locally.
+    for collection, table in MIRRORED_TABLES.items():
+        conn.exec_driver_sql(
+            f"UPDATE {table} SET upstream = 1 WHERE id IN ("
+            "SELECT value FROM sync_watermark, json_each(upstream_ids) "
+            "WHERE collection = ?"
+            f") OR '{collection}/' || id IN (SELECT key FROM cache_freshness)",
+            (collection,),
+        )
+    conn.exec_driver_sql(
+        "UPDATE founder SET upstream = 1 "
+        "WHERE startup_id IN (SELECT id FROM startup WHERE upstream)"
+    )
+
+
+# Applied in order; the schema version is the number of migrations applied,
+# stored in PRAGMA user_version. Only ever append to this list. Migrations
+# run after `create_all`, so they must tolerate objects that already exist.
+MIGRATIONS: list[Callable[[Connection], None]] = [
+    add_lookup_indexes,
+    add_project_like_count,
+    add_search_index,
+    add_upstream_provenance,
+]
+
+
+def get_version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def run_migrations(conn: Connection):
+    version = get_version(conn)
+    if version > len(MIGRATIONS):
+        raise MigrationError(
+            f"Database schema version {version} is newer than this code "
+            f"({len(MIGRATIONS)})"
+        )
+
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        logger.info(f"Migrating database to version {number}: {migration.__name__}")
+        migration(conn)
+        conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+
+
+__all__ = (
+    "MIGRATIONS",
+    "MIRRORED_TABLES",
+    "SEARCH_INDEXES",
+    "MigrationError",
+    "get_version",
+    "run_migrations",
+)
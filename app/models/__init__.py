@@ -1,19 +1,25 @@
+from .cache_freshness import CacheFreshness
 from .events import Event
 from .founders import Founder
+from .image_cache_entries import ImageCacheEntry
 from .investors import Investor
 from .news import News
 from .partners import Partner
 from .projects import Project
 from .startups import Startup
+from .sync_watermarks import SyncWatermark
 from .users import User
 
 __all__ = (
+    "CacheFreshness",
     "Event",
     "Founder",
+    "ImageCacheEntry",
     "Investor",
     "News",
     "Partner",
     "Startup",
+    "SyncWatermark",
     "User",
     "Project",
 )
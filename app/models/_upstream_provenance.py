@@ -0,0 +1,7 @@
+from sqlalchemy import Boolean, Column
+
+
+class UpstreamProvenance:
+    # Set on rows mirrored from the JEB API, never on rows created locally:
+    # ingestion only ever overwrites or deletes rows that have it.
+    upstream = Column(Boolean, nullable=False, default=False, server_default="0")
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Float, Integer, String
+
+from ..db import Base
+from ._table_name_provider import TableNameProvider
+
+
+class CacheFreshness(Base, TableNameProvider):
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, nullable=False, unique=True)  # upstream path, e.g. /news/3
+    fetched_at = Column(Float, nullable=False)  # unix timestamp of the last fetch
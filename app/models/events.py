@@ -2,9 +2,10 @@ from sqlalchemy import Column, Integer, String, Text
 
 from ..db import Base
 from ._table_name_provider import TableNameProvider
+from ._upstream_provenance import UpstreamProvenance
 
 
-class Event(Base, TableNameProvider):
+class Event(Base, TableNameProvider, UpstreamProvenance):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     dates = Column(String, nullable=True)
@@ -3,9 +3,10 @@ from sqlalchemy.orm import relationship
 
 from ..db import Base
 from ._table_name_provider import TableNameProvider
+from ._upstream_provenance import UpstreamProvenance
 
 
-class Founder(Base, TableNameProvider):
+class Founder(Base, TableNameProvider, UpstreamProvenance):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     startup_id = Column(Integer, ForeignKey("startup.id"), nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Boolean, Column, Float, Integer, String
+
+from ..db import Base
+from ._table_name_provider import TableNameProvider
+
+
+class ImageCacheEntry(Base, TableNameProvider):
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, nullable=False, unique=True)
+    source_url = Column(String, nullable=True)  # upstream path, None for uploads
+    size = Column(Integer, nullable=False)
+    last_access = Column(Float, nullable=False)
+    pinned = Column(Boolean, nullable=False, default=False)  # never evicted
@@ -4,9 +4,10 @@ from sqlalchemy.orm import relationship
 from ..db import Base
 from ._many_to_many import project_investors
 from ._table_name_provider import TableNameProvider
+from ._upstream_provenance import UpstreamProvenance
 
 
-class Investor(Base, TableNameProvider):
+class Investor(Base, TableNameProvider, UpstreamProvenance):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     legal_status = Column(String, nullable=True)
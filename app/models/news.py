@@ -3,9 +3,10 @@ from sqlalchemy.orm import relationship
 
 from ..db import Base
 from ._table_name_provider import TableNameProvider
+from ._upstream_provenance import UpstreamProvenance
 
 
-class News(Base, TableNameProvider):
+class News(Base, TableNameProvider, UpstreamProvenance):
     id = Column(Integer, primary_key=True, index=True)
     news_date = Column(Date, nullable=True)
     location = Column(String, nullable=True)
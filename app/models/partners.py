@@ -2,9 +2,10 @@ from sqlalchemy import Column, Date, Integer, String, Text
 
 from ..db import Base
 from ._table_name_provider import TableNameProvider
+from ._upstream_provenance import UpstreamProvenance
 
 
-class Partner(Base, TableNameProvider):
+class Partner(Base, TableNameProvider, UpstreamProvenance):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
     legal_status = Column(String, nullable=True)
@@ -14,6 +14,9 @@ class Project(Base, TableNameProvider):
     description = Column(String, nullable=False)
     worth = Column(Integer)
     startup_id = Column(Integer, ForeignKey("startup.id"), nullable=False)
+    # Number of user_likes rows of the project, kept up to date by triggers
+    # on user_likes (see app.migrations).
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     investors = relationship(
         "Investor",
@@ -5,9 +5,10 @@ from sqlalchemy.orm import relationship
 
 from ..db import Base
 from ._table_name_provider import TableNameProvider
+from ._upstream_provenance import UpstreamProvenance
 
 
-class Startup(Base, TableNameProvider):
+class Startup(Base, TableNameProvider, UpstreamProvenance):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     legal_status = Column(String, nullable=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Float, Integer, String, Text
+
+from ..db import Base
+from ._table_name_provider import TableNameProvider
+
+
+class SyncWatermark(Base, TableNameProvider):
+    id = Column(Integer, primary_key=True, index=True)
+    collection = Column(String, nullable=False, unique=True)  # upstream path
+    synced_at = Column(Float, nullable=False)  # unix timestamp of the last sync
+    upstream_ids = Column(Text, nullable=False, default="[]")  # JSON list
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    deleted = Column(Integer, nullable=False, default=0)
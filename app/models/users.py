@@ -4,9 +4,10 @@ from sqlalchemy.orm import relationship
 from ..db import Base
 from ._many_to_many import user_likes
 from ._table_name_provider import TableNameProvider
+from ._upstream_provenance import UpstreamProvenance
 
 
-class User(Base, TableNameProvider):
+class User(Base, TableNameProvider, UpstreamProvenance):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, nullable=False)
     auth = Column(String, nullable=True)
@@ -22,3 +23,8 @@ class User(Base, TableNameProvider):
         secondary=user_likes,
         back_populates="liked_by",
     )
+
+    @classmethod
+    def email_is(cls, email: str):
+        """Case-insensitive email match, served by the unique ix_user_email index."""
+        return cls.email.collate("NOCASE") == email
@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+SearchKind = Literal["startups", "projects", "news"]
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: int
+    # HTML-escaped, with the matched terms wrapped in <mark>.
+    title: str
+    snippet: str
+    score: float
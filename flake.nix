@@ -35,6 +35,7 @@
             aiohttp
             aiosqlite
             bcrypt
+            brotli
             email-validator
             fastapi
             fastapi
@@ -44,6 +45,7 @@
             jinja2
             markdownify
             passlib
+            pillow
             pydantic
             pydantic-settings
             pyjwt
@@ -0,0 +1,20 @@
+// Collection endpoints are paginated: each response is one page (a JSON
+// array) and the X-Next-Cursor header, when present, points to the next.
+export async function fetchAllPages<T>(
+  url: string,
+  init?: RequestInit,
+): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const separator = url.includes("?") ? "&" : "?";
+    const res = await fetch(
+      cursor ? `${url}${separator}after=${encodeURIComponent(cursor)}` : url,
+      init,
+    );
+    if (!res.ok) throw new Error(`${url}: ${res.status}`);
+    items.push(...((await res.json()) as T[]));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+}
@@ -5,6 +5,7 @@ import { Calendar, dateFnsLocalizer } from "react-big-calendar";
 import "react-big-calendar/lib/css/react-big-calendar.css";
 import "./calendar.scss";
 import { API_BASE_URL } from "@/api_url";
+import { fetchAllPages } from "@/fetch_pages";
 
 const locales = {
   "en-US": enUS,
@@ -55,10 +56,9 @@ export default function CalendarPage() {
   const [calendarMode, setCalendarMode] = useState<boolean>(false);
 
   useEffect(() => {
-    fetch(`${API_BASE_URL}/api/events`, {
+    fetchAllPages<Event>(`${API_BASE_URL}/api/events`, {
       headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
     })
-      .then((res) => res.json())
       .then((data: Event[]) => {
         setEvents(data);
         setFiltered(data);
@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import "./catalog.scss";
 import { API_BASE_URL } from "@/api_url";
+import { fetchAllPages } from "@/fetch_pages";
 
 interface Project {
   logo: string;
@@ -21,12 +22,11 @@ export default function CatalogPage() {
   });
 
   useEffect(() => {
-    fetch(`${API_BASE_URL}/api/projects/`, {
+    fetchAllPages<Project>(`${API_BASE_URL}/api/projects/`, {
       headers: {
         Authorization: `Bearer ${localStorage.getItem("token")}`,
       },
     })
-      .then((res) => res.json())
       .then((data: Project[]) => {
         setProjects(data);
         setFiltered(data);
@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import { API_BASE_URL } from "@/api_url";
+import { fetchAllPages } from "@/fetch_pages";
 import "./enterprise.scss";
 
 interface Project {
@@ -49,18 +50,16 @@ export default function EnterprisePage() {
 
   // Fetch projects and startups
   useEffect(() => {
-    fetch(`${API_BASE_URL}/api/projects/`, {
+    fetchAllPages<Project>(`${API_BASE_URL}/api/projects/`, {
       headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
     })
-      .then((res) => res.json())
       .then(setProjects);
 
-    fetch(`${API_BASE_URL}/api/startups`, {
+    fetchAllPages<Startup>(`${API_BASE_URL}/api/startups`, {
       headers: {
         Authorization: `Bearer ${localStorage.getItem("token")}`,
       },
     })
-      .then((res) => res.json())
       .then(setStartups);
   }, []);
 
@@ -141,10 +140,9 @@ export default function EnterprisePage() {
   }
 
   function refreshProjects() {
-    fetch(`${API_BASE_URL}/api/projects/`, {
+    fetchAllPages<Project>(`${API_BASE_URL}/api/projects/`, {
       headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
     })
-      .then((res) => res.json())
       .then(setProjects);
   }
 
@@ -205,10 +203,9 @@ export default function EnterprisePage() {
   }
 
   function refreshStartups() {
-    fetch(`${API_BASE_URL}/api/startups`, {
+    fetchAllPages<Startup>(`${API_BASE_URL}/api/startups`, {
       headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
     })
-      .then((res) => res.json())
       .then(setStartups);
   }
 
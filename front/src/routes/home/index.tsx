@@ -39,11 +39,11 @@ export default function HomePage() {
   const [projects, setProjects] = useState<Project[] | null>([]);
 
   useEffect(() => {
-    fetch(`${API_BASE_URL}/api/projects/`, {
+    fetch(`${API_BASE_URL}/api/projects/?limit=5`, {
       headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
     })
       .then((res) => res.json())
-      .then((list: Project[]) => setProjects(list.slice(0, 5)))
+      .then((list: Project[]) => setProjects(list))
       .catch(console.error);
   }, []);
 
@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import { API_BASE_URL } from "@/api_url";
+import { fetchAllPages } from "@/fetch_pages";
 
 import "./style.scss";
 
@@ -38,10 +39,9 @@ export default function NewsPage() {
   const [news, setNews] = useState<News[] | null>(null);
 
   useEffect(() => {
-    fetch(`${API_BASE_URL}/api/news/`, {
+    fetchAllPages<News>(`${API_BASE_URL}/api/news/`, {
       headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
     })
-      .then((res) => res.json())
       .then((list: News[]) => setNews(list))
       .catch(console.error);
   }, []);
@@ -1,10 +1,51 @@
+import { readdirSync, readFileSync, statSync, writeFileSync } from "node:fs";
 import path from "node:path";
+import { brotliCompressSync, constants, gzipSync } from "node:zlib";
 import react from "@vitejs/plugin-react";
-import { defineConfig } from "vite";
+import { defineConfig, type Plugin } from "vite";
+
+const COMPRESSIBLE = /\.(css|html|js|json|map|mjs|svg|txt|xml)$/;
+const MIN_SIZE = 1024;
+
+// Writes .br and .gz siblings of the text files in the build output, at the
+// highest levels since this runs once; the backend serves them as is.
+function precompress(): Plugin {
+  let outDir = "";
+  return {
+    name: "precompress",
+    apply: "build",
+    configResolved(config) {
+      outDir = path.resolve(config.root, config.build.outDir);
+    },
+    closeBundle() {
+      for (const name of readdirSync(outDir, { recursive: true })) {
+        const file = path.join(outDir, name.toString());
+        if (!COMPRESSIBLE.test(file) || statSync(file).size < MIN_SIZE) {
+          continue;
+        }
+        const data = readFileSync(file);
+        const variants = {
+          ".br": brotliCompressSync(data, {
+            params: {
+              [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+              [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+            },
+          }),
+          ".gz": gzipSync(data, { level: constants.Z_BEST_COMPRESSION }),
+        };
+        for (const [suffix, compressed] of Object.entries(variants)) {
+          if (compressed.length < data.length) {
+            writeFileSync(file + suffix, compressed);
+          }
+        }
+      }
+    },
+  };
+}
 
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompress()],
   resolve: {
     alias: {
       "@": path.resolve(__dirname, "src"),
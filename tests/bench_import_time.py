@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Reports where the time goes when importing the backend.
+
+Runs `python -X importtime` on `app.main` in fresh interpreters, keeps the
+fastest run and prints the total, the slowest packages and modules, and
+whether the dependencies that should load on first use stayed unloaded.
+
+Usage: python tests/bench_import_time.py [runs] [top]
+"""
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGET = "app.main"
+
+# Only needed by some requests: importing them at startup is a regression.
+LAZY_MODULES = (
+    "aiohttp",
+    "brotli",
+    "jinja2",
+    "passlib",
+    "smtplib",
+    "sqlmodel",
+    "uvicorn",
+)
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def run_importtime(target: str = TARGET) -> tuple[list[ImportTiming], set[str]]:
+    """Imports `target` in a new interpreter; returns its timings and modules."""
+    env = dict(os.environ)
+    for key in ("JEB_API_URL", "JEB_API_AUTH", "JWT_SECRET", "MAIL_USER", "MAIL_PASS"):
+        env.setdefault(key, "bench")
+    code = (
+        "import sys; sys.argv.append('dev'); "
+        f"import {target}; print(' '.join(sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr), set(result.stdout.split())
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        timings.append(
+            ImportTiming(
+                module=name.strip(),
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return timings
+
+
+def total_us(timings: list[ImportTiming], target: str = TARGET) -> int:
+    return next(t.cumulative_us for t in timings if t.module == target)
+
+
+def fastest_run(runs: int) -> tuple[list[ImportTiming], set[str]]:
+    return min(
+        (run_importtime() for _ in range(runs)), key=lambda run: total_us(run[0])
+    )
+
+
+def report(timings: list[ImportTiming], modules: set[str], top: int):
+    print(f"import {TARGET}: {total_us(timings) / 1000:.1f}ms")
+
+    by_package = defaultdict(int)
+    for timing in timings:
+        by_package[timing.module.split(".")[0]] += timing.self_us
+    print(f"\nSlowest packages (self time, top {top})")
+    for package, us in sorted(by_package.items(), key=lambda p: -p[1])[:top]:
+        print(f"  {us / 1000:>8.1f}ms  {package}")
+
+    print(f"\nSlowest modules (self time, top {top})")
+    for timing in sorted(timings, key=lambda t: -t.self_us)[:top]:
+        print(f"  {timing.self_us / 1000:>8.1f}ms  {timing.module}")
+
+    print("\nLoaded on first use")
+    for module in LAZY_MODULES:
+        state = "imported at startup" if module in modules else "lazy"
+        print(f"  {module:<10} {state}")
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    report(*fastest_run(runs), top)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Measures the hot lookups against growing tables, with and without the
+indexes added by the migrations in `app.migrations`.
+
+Without them every lookup scans its table, so its cost grows with the row
+count; with them it stays flat (O(log n)). The query plan of each lookup is
+printed for the largest size.
+
+Usage: python tests/bench_indexes.py [sizes...]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for key in ("JEB_API_URL", "JEB_API_AUTH", "JWT_SECRET", "MAIL_USER", "MAIL_PASS"):
+    os.environ.setdefault(key, "bench")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.models import Founder, News, Project, Startup, User  # noqa: E402
+from app.models._many_to_many import user_likes  # noqa: E402
+
+SIZES = [int(size) for size in sys.argv[1:]] or [1_000, 10_000, 100_000]
+LOOKUPS = 300
+
+
+def lookups(size: int) -> dict:
+    return {
+        "login (email)": lambda: select(User).where(
+            User.email_is(f"USER{random.randrange(size)}@example.com")
+        ),
+        "projects of startup": lambda: select(Project).where(
+            Project.startup_id == random.randrange(size // 10)
+        ),
+        "news of startup": lambda: select(News).where(
+            News.startup_id == random.randrange(size // 10)
+        ),
+        "founders of startup": lambda: select(Founder).where(
+            Founder.startup_id == random.randrange(size // 10)
+        ),
+        "likes of user": lambda: select(user_likes).where(
+            user_likes.c.user_id == random.randrange(size)
+        ),
+    }
+
+
+async def populate(conn, size: int):
+    startups = size // 10
+    await conn.execute(
+        insert(Startup), [{"id": i, "name": "s", "email": "e"} for i in range(startups)]
+    )
+    await conn.execute(
+        insert(User),
+        [
+            {"id": i, "email": f"user{i}@example.com", "name": "u", "role": "USER"}
+            for i in range(size)
+        ],
+    )
+    for model in (Project, News, Founder):
+        await conn.execute(
+            insert(model),
+            [
+                {
+                    "id": i,
+                    "name": "n",
+                    "description": "d",
+                    "startup_id": i % startups,
+                }
+                for i in range(size)
+            ],
+        )
+    await conn.execute(
+        insert(user_likes),
+        [{"user_id": i, "project_id": (i * 7) % size} for i in range(size)],
+    )
+
+
+async def measure(size: int, migrated: bool, explain: bool) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await populate(conn, size)
+            if migrated:
+                await conn.run_sync(run_migrations)
+
+        timings = {}
+        async with engine.connect() as conn:
+            for name, query in lookups(size).items():
+                if explain:
+                    compiled = query().compile(compile_kwargs={"literal_binds": True})
+                    plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+                    print(f"  {name:<20} {' / '.join(row[-1] for row in plan)}")
+                samples = []
+                for _ in range(LOOKUPS):
+                    stmt = query()
+                    start = time.perf_counter()
+                    (await conn.execute(stmt)).all()
+                    samples.append((time.perf_counter() - start) * 1e6)
+                timings[name] = statistics.median(samples)
+        await engine.dispose()
+        return timings
+
+
+async def main():
+    results = {}
+    for size in SIZES:
+        for migrated in (False, True):
+            explain = size == SIZES[-1]
+            if explain:
+                print(f"Query plans at {size} rows, indexed={migrated}:")
+            results[size, migrated] = await measure(size, migrated, explain)
+
+    names = list(lookups(SIZES[0]))
+    print(f"\nMedian lookup time in µs over {LOOKUPS} lookups")
+    print(f"{'rows':>8} {'indexes':>8} " + " ".join(f"{n:>20}" for n in names))
+    for (size, migrated), timings in results.items():
+        print(
+            f"{size:>8} {'yes' if migrated else 'no':>8} "
+            + " ".join(f"{timings[n]:>20.1f}" for n in names)
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
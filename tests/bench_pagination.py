@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compares OFFSET pagination with the keyset pagination of
+`app.helpers.pagination` on increasingly deep pages.
+
+An OFFSET query reads and drops every row before the page, so its cost
+grows with the page number; a keyset query seeks to the cursor through the
+primary key and costs the same on every page.
+
+Usage: python tests/bench_pagination.py [rows] [page size]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for key in ("JEB_API_URL", "JEB_API_AUTH", "JWT_SECRET", "MAIL_USER", "MAIL_PASS"):
+    os.environ.setdefault(key, "bench")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.helpers.pagination import PageRequest, paginate  # noqa: E402
+from app.models import News  # noqa: E402
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+PAGE_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+PAGES = [1, 10, 100, 1_000, 10_000]
+SAMPLES = 50
+
+
+async def offset_page(db: AsyncSession, number: int):
+    stmt = select(News).order_by(News.id).offset((number - 1) * PAGE_SIZE)
+    return (await db.scalars(stmt.limit(PAGE_SIZE))).all()
+
+
+async def keyset_page(db: AsyncSession, number: int):
+    # The cursor of page n is the key of the last row of page n - 1.
+    after = (number - 1) * PAGE_SIZE if number > 1 else None
+    return (
+        await paginate(db, select(News), News.id, PageRequest(after, PAGE_SIZE))
+    ).items
+
+
+async def median_us(db: AsyncSession, fetch, number: int) -> float:
+    samples = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        rows = await fetch(db, number)
+        samples.append((time.perf_counter() - start) * 1e6)
+        db.expunge_all()
+    assert len(rows) == PAGE_SIZE, f"page {number} is short"
+    return statistics.median(samples)
+
+
+async def main():
+    pages = [n for n in PAGES if n * PAGE_SIZE <= ROWS]
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(News),
+                [{"id": i, "title": f"news {i}"} for i in range(1, ROWS + 1)],
+            )
+
+        print(f"Median time in µs for a page of {PAGE_SIZE} among {ROWS} rows")
+        print(f"{'page':>8} {'offset':>10} {'keyset':>10}")
+        async with AsyncSession(engine) as db:
+            for number in pages:
+                offset = await median_us(db, offset_page, number)
+                keyset = await median_us(db, keyset_page, number)
+                print(f"{number:>8} {offset:>10.1f} {keyset:>10.1f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compares the per-miss latency of `fetch_from_api` against the previous
+behaviour of opening a new `aiohttp.ClientSession` for every upstream call.
+
+A local aiohttp server stands in for the JEB API, so the numbers only show
+the TCP connection setup cost; against the real (TLS) API the gap is larger.
+
+Usage: python tests/bench_upstream_client.py [requests]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for key in ("JEB_API_URL", "JEB_API_AUTH", "JWT_SECRET", "MAIL_USER", "MAIL_PASS"):
+    os.environ.setdefault(key, "bench")
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.helpers.caching_proxy import fetch_from_api  # noqa: E402
+from app.helpers.upstream import close_client  # noqa: E402
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+async def fake_startup(request: web.Request):
+    return web.json_response({"id": int(request.match_info["id"]), "name": "bench"})
+
+
+async def fetch_with_new_session(api_url: str, **kwargs):
+    url = (settings.jeb_api_url + api_url).format(**kwargs)
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            url, headers={"X-Group-Authorization": settings.jeb_api_auth}
+        ) as response:
+            return await response.json(), response.status
+
+
+async def measure(fetch) -> list[float]:
+    timings = []
+    for i in range(REQUESTS):
+        start = time.perf_counter()
+        _, status = await fetch("/startups/{startup_id}", startup_id=i)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert status == 200
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{name:<18} mean={statistics.mean(timings):.3f}ms "
+        f"p50={statistics.median(timings):.3f}ms p95={p95:.3f}ms"
+    )
+
+
+async def main():
+    app = web.Application()
+    app.router.add_get("/startups/{id}", fake_startup)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    settings.jeb_api_url = f"http://127.0.0.1:{port}"
+
+    try:
+        print(f"{REQUESTS} sequential cache misses against {settings.jeb_api_url}")
+        report("session per call", await measure(fetch_with_new_session))
+        report("pooled client", await measure(fetch_from_api))
+    finally:
+        await close_client()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
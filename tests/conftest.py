@@ -0,0 +1,172 @@
+import asyncio
+import importlib
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+
+import pytest
+
+for key in ("JEB_API_URL", "JEB_API_AUTH", "JWT_SECRET", "MAIL_USER", "MAIL_PASS"):
+    os.environ.setdefault(key, "test")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+
+# Modules opening their own sessions on the app database.
+SESSION_MODULES = (
+    "app.db",
+    "app.helpers.caching_proxy",
+    "app.helpers.hydration",
+    "app.helpers.image_cache",
+    "app.helpers.prefetch",
+    "app.helpers.sync",
+    "app.helpers.warmup",
+)
+
+
+@pytest.fixture
+def run_db():
+    """
+    Runs `await test(engine)` in a fresh event loop, on an empty in-memory
+    database with every table created and, with `migrate`, every migration
+    applied. The engine is disposed afterwards.
+    """
+
+    def run(test, migrate: bool = False):
+        async def main():
+            # A single shared connection: every session sees the same database.
+            engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                    if migrate:
+                        await conn.run_sync(run_migrations)
+                return await test(engine)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+class FakeUpstream:
+    """
+    Stand-in for the JEB API, served by aiohttp on a local port.
+
+    `routes` maps a path to `(status, body)`: bytes are served as a PNG,
+    anything else as JSON, and unknown paths answer 404. With `chunked`,
+    images are streamed without a Content-Length. Every answer waits
+    `delay` seconds. `calls` counts the requests received per path.
+    """
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch):
+        self.monkeypatch = monkeypatch
+        self.routes: dict[str, tuple[int, object]] = {}
+        self.calls: Counter[str] = Counter()
+        self.chunked = False
+        self.delay = 0.0
+
+    async def handle(self, request):
+        from aiohttp import web
+
+        self.calls[request.path] += 1
+        await asyncio.sleep(self.delay)
+        if request.path not in self.routes:
+            return web.json_response({"detail": "Not Found"}, status=404)
+        status, body = self.routes[request.path]
+        if isinstance(body, bytes) and self.chunked:
+            response = web.StreamResponse(status=status)
+            response.content_type = "image/png"
+            response.enable_chunked_encoding()
+            await response.prepare(request)
+            for i in range(0, len(body), 1024):
+                await response.write(body[i : i + 1024])
+            await response.write_eof()
+            return response
+        if isinstance(body, bytes):
+            return web.Response(body=body, status=status, content_type="image/png")
+        return web.json_response(body, status=status)
+
+    def use_database(self, engine):
+        """Points every module opening its own sessions at `engine`."""
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        for name in SESSION_MODULES:
+            module = importlib.import_module(name)
+            for attribute in ("async_session", "read_session"):
+                if hasattr(module, attribute):
+                    self.monkeypatch.setattr(module, attribute, sessions)
+
+    @asynccontextmanager
+    async def serving(self, engine):
+        """
+        Serves the fake upstream and yields a client of the app's API, both
+        running on the current event loop and backed by `engine`.
+        """
+        import httpx
+        from aiohttp import web
+        from fastapi import FastAPI
+
+        from app import endpoints
+        from app.helpers.upstream import close_client
+
+        self.use_database(engine)
+        server = web.Application()
+        server.router.add_route("GET", "/{path:.*}", self.handle)
+        runner = web.AppRunner(server)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        self.monkeypatch.setattr(settings, "jeb_api_url", f"http://{host}:{port}")
+
+        api = FastAPI()
+        endpoints.register_all(api)
+        transport = httpx.ASGITransport(app=api)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://app"
+            ) as client:
+                yield client
+        finally:
+            await close_client()
+            await runner.cleanup()
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    """
+    A `FakeUpstream`, with the proxy state reset: circuit breakers, the 404
+    cache, in-flight calls, the scheduler, the response cache and an empty
+    image cache stored under `tmp_path`.
+    """
+    from app.helpers import caching_proxy, image_cache, image_variants
+    from app.helpers.circuit_breaker import NegativeCache
+    from app.helpers.response_cache import response_cache
+    from app.helpers.single_flight import SingleFlight
+    from app.helpers.upstream_scheduler import TokenBucket, UpstreamScheduler
+
+    images = tmp_path / "images"
+    images.mkdir()
+    cache = image_cache.ImageCache(settings.image_cache_max_bytes, interval=60)
+    for module in (caching_proxy, image_cache):
+        monkeypatch.setattr(module, "CACHE_DIR", images)
+    for module in (caching_proxy, image_cache, image_variants):
+        monkeypatch.setattr(module, "image_cache", cache)
+    monkeypatch.setattr(caching_proxy, "upstream_breakers", {})
+    monkeypatch.setattr(
+        caching_proxy, "missing_resources", NegativeCache(60, max_entries=100)
+    )
+    monkeypatch.setattr(caching_proxy, "upstream_flights", SingleFlight())
+    monkeypatch.setattr(
+        caching_proxy,
+        "upstream_scheduler",
+        UpstreamScheduler(16, 4, TokenBucket(rate=0, burst=1)),
+    )
+    response_cache.clear()
+    yield FakeUpstream(monkeypatch)
+    response_cache.clear()
@@ -0,0 +1,115 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.crud.bulk import upsert_rows
+from app.crud.startup import upsert_startup_details
+from app.jeb_schema import StartupDetail
+from app.models import Founder, Startup
+
+
+def run_upserts(run_db, *batches):
+    async def test(engine):
+        async with async_sessionmaker(engine)() as session:
+            for batch in batches:
+                await upsert_rows(session, Startup, batch)
+                await session.commit()
+            return (await session.scalars(select(Startup).order_by(Startup.id))).all()
+
+    return run_db(test)
+
+
+def test_repeated_ingest_updates_instead_of_conflicting(run_db):
+    rows = run_upserts(
+        run_db,
+        [
+            {"id": 1, "name": "a", "email": "a@b.c"},
+            {"id": 2, "name": "b", "email": "x"},
+        ],
+        [{"id": 1, "name": "renamed", "email": "a@b.c"}],
+    )
+    assert [(row.id, row.name) for row in rows] == [(1, "renamed"), (2, "b")]
+
+
+def test_columns_missing_from_payload_are_kept(run_db):
+    rows = run_upserts(
+        run_db,
+        [{"id": 1, "name": "a", "email": "e", "description": "detail"}],
+        [{"id": 1, "name": "a", "email": "e", "founders": []}],
+    )
+    assert rows[0].description == "detail"
+
+
+def test_startup_details_are_written_with_their_founders(run_db):
+    async def test(engine):
+        details = [
+            StartupDetail(
+                id=i,
+                name=f"s{i}",
+                legal_status=None,
+                address=None,
+                email="e",
+                phone=None,
+                sector=None,
+                maturity=None,
+                created_at=None,
+                description=f"detail {i}",
+                website_url=None,
+                social_media_url=None,
+                project_status=None,
+                needs=None,
+                founders=[
+                    {"id": 10 * i + j, "name": "f", "startup_id": i} for j in (0, 1)
+                ],
+            )
+            for i in (1, 2)
+        ]
+        async with async_sessionmaker(engine)() as session:
+            await upsert_startup_details(session, details)
+            await upsert_startup_details(session, details)
+            await session.commit()
+            startups = (await session.scalars(select(Startup))).all()
+            founders = (await session.scalars(select(Founder))).all()
+        return startups, founders
+
+    startups, founders = run_db(test)
+    assert sorted(s.description for s in startups) == ["detail 1", "detail 2"]
+    assert sorted(f.id for f in founders) == [10, 11, 20, 21]
+
+
+def test_local_rows_are_not_overwritten(run_db):
+    async def test(engine):
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(Startup).values(id=1, name="local", email="l@b.c")
+            )
+            await conn.execute(insert(Founder).values(id=1, name="me", startup_id=1))
+        async with async_sessionmaker(engine)() as session:
+            await upsert_startup_details(
+                session,
+                [
+                    StartupDetail.model_validate(
+                        {
+                            **dict.fromkeys(StartupDetail.model_fields),
+                            "id": i,
+                            "name": "upstream",
+                            "email": "u@b.c",
+                            "founders": [{"id": 10 + i, "name": "f", "startup_id": i}],
+                        }
+                    )
+                    for i in (1, 2)
+                ],
+            )
+            await session.commit()
+            startups = (
+                await session.execute(
+                    select(Startup.id, Startup.name, Startup.upstream)
+                )
+            ).all()
+            founders = (
+                await session.execute(select(Founder.id, Founder.upstream))
+            ).all()
+        return startups, founders
+
+    startups, founders = run_db(test)
+    assert sorted(startups) == [(1, "local", False), (2, "upstream", True)]
+    assert sorted(founders) == [(1, False), (12, True)]
@@ -0,0 +1,271 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import update
+from starlette.requests import Request
+
+from app.helpers import caching_proxy
+from app.models import CacheFreshness
+
+
+def news(*titles: str) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "news_date": None,
+            "location": None,
+            "title": title,
+            "category": None,
+            "startup_id": None,
+        }
+        for i, title in enumerate(titles, start=1)
+    ]
+
+
+async def age_by(engine, seconds: float):
+    """Makes every cached row look fetched `seconds` ago."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(CacheFreshness).values(fetched_at=time.time() - seconds)
+        )
+    caching_proxy.response_cache.clear()
+
+
+async def titles(client) -> list[str]:
+    response = await client.get("/api/news")
+    assert response.status_code == 200
+    return [item["title"] for item in response.json()]
+
+
+def test_fresh_rows_are_served_without_calling_upstream(run_db, upstream):
+    upstream.routes["/news"] = (200, news("first"))
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            return [await titles(client) for _ in range(3)]
+
+    assert run_db(test) == [["first"]] * 3
+    assert upstream.calls["/news"] == 1
+
+
+def test_stale_rows_are_served_then_refreshed_in_the_background(run_db, upstream):
+    upstream.routes["/news"] = (200, news("first"))
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            await titles(client)
+            upstream.routes["/news"] = (200, news("second"))
+            await age_by(engine, 121)
+            stale = await titles(client)
+            await asyncio.gather(*caching_proxy.background_refreshes)
+            return stale, await titles(client)
+
+    assert run_db(test) == (["first"], ["second"])
+    assert upstream.calls["/news"] == 2
+
+
+def test_expired_rows_are_refreshed_before_answering(run_db, upstream):
+    upstream.routes["/news"] = (200, news("first"))
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            await titles(client)
+            upstream.routes["/news"] = (200, news("second"))
+            await age_by(engine, 120 + 3600 + 1)
+            return await titles(client)
+
+    assert run_db(test) == ["second"]
+
+
+def test_expired_rows_are_served_when_upstream_fails(run_db, upstream):
+    upstream.routes["/news"] = (200, news("first"))
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            await titles(client)
+            upstream.routes["/news"] = (500, {"detail": "boom"})
+            await age_by(engine, 120 + 3600 + 1)
+            return await titles(client)
+
+    assert run_db(test) == ["first"]
+    assert upstream.calls["/news"] == 2
+
+
+@pytest.mark.parametrize("stale", [False, True])
+def test_pages_and_fieldsets_share_one_upstream_fetch(run_db, upstream, stale):
+    upstream.routes["/news"] = (200, news(*"abcdef"))
+    queries = [f"limit={n}" for n in range(1, 5)] + ["fields=title", "fields=location"]
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            if stale:
+                await client.get("/api/news")
+                await age_by(engine, 120 + 3600 + 1)
+                upstream.calls.clear()
+            upstream.delay = 0.2
+            return await asyncio.gather(
+                *(client.get(f"/api/news?{query}") for query in queries)
+            )
+
+    responses = run_db(test)
+    assert upstream.calls["/news"] == 1
+    assert [len(response.json()) for response in responses[:4]] == [1, 2, 3, 4]
+    assert responses[4].json()[0] == {"id": 1, "title": "a"}
+    assert responses[5].json()[0] == {"id": 1, "location": None}
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(4096)
+
+
+def cached_files(directory) -> list[str]:
+    return sorted(path.name for path in directory.iterdir())
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_image_is_streamed_to_the_cache(run_db, upstream, chunked):
+    upstream.chunked = chunked
+    upstream.routes["/news/1/image"] = (200, PNG)
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            first = await client.get("/api/news/1/image")
+            second = await client.get("/api/news/1/image")
+            return first, second
+
+    first, second = run_db(test)
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content == PNG
+    assert upstream.calls["/news/1/image"] == 1
+    (name,) = cached_files(caching_proxy.CACHE_DIR)
+    assert name.endswith(".png") and not name.startswith(".")
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_oversized_image_leaves_nothing_behind(run_db, upstream, monkeypatch, chunked):
+    monkeypatch.setattr(caching_proxy.settings, "image_max_bytes", 2048)
+    upstream.chunked = chunked
+    upstream.routes["/news/1/image"] = (200, PNG)
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            return await client.get("/api/news/1/image")
+
+    assert run_db(test).status_code == 502
+    assert cached_files(caching_proxy.CACHE_DIR) == []
+
+
+def test_partial_downloads_are_removed(upstream):
+    (caching_proxy.CACHE_DIR / ".abc.part").write_bytes(b"trunc")
+    (caching_proxy.CACHE_DIR / "abc.png").write_bytes(PNG)
+    caching_proxy.remove_partial_downloads()
+    assert cached_files(caching_proxy.CACHE_DIR) == ["abc.png"]
+
+
+def test_cached_image_is_revalidated(run_db, upstream):
+    upstream.routes["/news/1/image"] = (200, PNG)
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            first = await client.get("/api/news/1/image")
+            etag = first.headers["etag"]
+            last_modified = first.headers["last-modified"]
+            conditional = {
+                "matching etag": {"If-None-Match": etag},
+                "weak etag in a list": {"If-None-Match": f'"other", W/{etag}'},
+                "any etag": {"If-None-Match": "*"},
+                "other etag": {"If-None-Match": '"other"'},
+                "not modified since": {"If-Modified-Since": last_modified},
+                "modified since": {
+                    "If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"
+                },
+                "etag wins over date": {
+                    "If-None-Match": '"other"',
+                    "If-Modified-Since": last_modified,
+                },
+                "invalid date": {"If-Modified-Since": "yesterday"},
+            }
+            return first, {
+                name: await client.get("/api/news/1/image", headers=headers)
+                for name, headers in conditional.items()
+            }
+
+    first, responses = run_db(test)
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    assert first.headers["content-type"] == "image/png"
+    assert {name: response.status_code for name, response in responses.items()} == {
+        "matching etag": 304,
+        "weak etag in a list": 304,
+        "any etag": 304,
+        "other etag": 200,
+        "not modified since": 304,
+        "modified since": 200,
+        "etag wins over date": 200,
+        "invalid date": 200,
+    }
+    not_modified = responses["matching etag"]
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == first.headers["etag"]
+    assert upstream.calls["/news/1/image"] == 1
+
+
+def test_etag_changes_with_the_file(upstream):
+    path = caching_proxy.CACHE_DIR / "abc.png"
+    path.write_bytes(PNG)
+    request = Request({"type": "http", "headers": []})
+    before = caching_proxy.image_response(request, path).headers["etag"]
+    path.write_bytes(PNG + b"more")
+    after = caching_proxy.image_response(request, path).headers["etag"]
+    assert before != after
+
+
+def test_upstream_errors_reach_the_client(run_db, upstream, monkeypatch):
+    upstream.routes["/news"] = (200, news("first"))
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            missing = await client.get("/api/news/5")
+            url = caching_proxy.settings.jeb_api_url
+            monkeypatch.setattr(caching_proxy.settings, "jeb_api_url", "http://[::1]:9")
+            unreachable = await client.get("/api/news")
+            monkeypatch.setattr(caching_proxy.settings, "jeb_api_url", url)
+            return missing, unreachable, await client.get("/api/news")
+
+    missing, unreachable, recovered = run_db(test)
+    assert missing.status_code == 404
+    assert missing.json() == {"detail": "Not Found"}
+    assert unreachable.status_code == 502
+    assert unreachable.json()["detail"].startswith("External api call fail")
+    assert recovered.status_code == 200
+    assert [item["title"] for item in recovered.json()] == ["first"]
+
+
+def test_open_breaker_answers_503(run_db, upstream, monkeypatch):
+    monkeypatch.setattr(caching_proxy.settings, "upstream_failure_threshold", 2)
+    upstream.routes["/events"] = (500, {"detail": "boom"})
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            return [(await client.get("/api/events")).status_code for _ in range(3)]
+
+    assert run_db(test) == [500, 500, 503]
+    assert upstream.calls["/events"] == 2
+
+
+def test_oversized_images_do_not_open_the_breaker(run_db, upstream, monkeypatch):
+    monkeypatch.setattr(caching_proxy.settings, "upstream_failure_threshold", 2)
+    monkeypatch.setattr(caching_proxy.settings, "image_max_bytes", 2048)
+    for id in (1, 2, 3):
+        upstream.routes[f"/news/{id}/image"] = (200, PNG)
+    upstream.routes["/news/4/image"] = (200, PNG[:1024])
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            return [
+                (await client.get(f"/api/news/{id}/image")).status_code
+                for id in (1, 2, 3, 4)
+            ]
+
+    assert run_db(test) == [502, 502, 502, 200]
+    breaker = caching_proxy.upstream_breakers["/news/{news_id}/image"]
+    assert breaker.stats()["state"] == "closed"
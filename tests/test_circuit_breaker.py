@@ -0,0 +1,60 @@
+from app.helpers.circuit_breaker import BreakerState, CircuitBreaker, NegativeCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_lets_a_single_probe_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now = 10
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    clock.now = 15
+    assert not breaker.allow()
+
+
+def test_negative_cache_expires():
+    clock = FakeClock()
+    missing = NegativeCache(ttl=5, max_entries=10, clock=clock)
+    missing.add("/users/42")
+    assert "/users/42" in missing
+    clock.now = 5
+    assert "/users/42" not in missing
@@ -0,0 +1,147 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.testclient import TestClient
+
+from app.helpers.compression import (
+    IMMUTABLE,
+    CompressionMiddleware,
+    PrecompressedStaticFiles,
+    choose_encoding,
+)
+
+GZIP = {"Accept-Encoding": "gzip"}
+ROWS = [{"id": i, "name": f"startup {i}"} for i in range(200)]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.9", "gzip"),
+        ("br;q=0, *", "gzip"),
+        ("identity", None),
+        ("", None),
+        ("gzip;q=nope", None),
+    ],
+)
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, ("br", "gzip")) == expected
+
+
+def api_client() -> TestClient:
+    async def rows(request):
+        return JSONResponse(ROWS)
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def image(request):
+        return Response(b"\x89PNG" + bytes(4096), media_type="image/png")
+
+    async def stream(request):
+        async def chunks():
+            for _ in range(10):
+                yield b"line of text\n" * 10
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app = Starlette(
+        routes=[
+            Route("/rows", rows),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/stream", stream),
+        ]
+    )
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=500, gzip_level=6, brotli_quality=4
+    )
+    return TestClient(app)
+
+
+def test_large_json_is_compressed():
+    response = api_client().get("/rows", headers=GZIP)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content) / 4
+    assert response.json() == ROWS
+
+
+def test_streamed_text_is_compressed():
+    response = api_client().get("/stream", headers=GZIP)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "line of text\n" * 100
+
+
+@pytest.mark.parametrize(
+    "path, headers",
+    [
+        ("/small", GZIP),
+        ("/image", GZIP),
+        ("/rows", {"Accept-Encoding": "identity"}),
+    ],
+)
+def test_passthrough(path, headers):
+    response = api_client().get(path, headers=headers)
+    assert "content-encoding" not in response.headers
+
+
+def test_brotli():
+    pytest.importorskip("brotli")
+    response = api_client().get("/rows", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == ROWS
+
+
+@pytest.fixture
+def dist(tmp_path):
+    (tmp_path / "assets").mkdir()
+    script = b"console.log('hello');\n" * 100
+    (tmp_path / "assets" / "index-Bx4_a9Zq.js").write_bytes(script)
+    (tmp_path / "assets" / "index-Bx4_a9Zq.js.gz").write_bytes(gzip.compress(script))
+    (tmp_path / "index.html").write_text("<html></html>")
+    app = Starlette(
+        routes=[Mount("/", PrecompressedStaticFiles(directory=tmp_path, html=True))]
+    )
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=10, gzip_level=6, brotli_quality=4
+    )
+    return TestClient(app), script
+
+
+def test_precompressed_sibling_is_served(dist):
+    client, script = dist
+    response = client.get("/assets/index-Bx4_a9Zq.js", headers=GZIP)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.content == script
+
+    etag = response.headers["etag"]
+    response = client.get(
+        "/assets/index-Bx4_a9Zq.js", headers={**GZIP, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == IMMUTABLE
+
+
+def test_uncompressed_file_without_accept_encoding(dist):
+    client, script = dist
+    response = client.get(
+        "/assets/index-Bx4_a9Zq.js", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == script
+
+
+def test_index_is_revalidated(dist):
+    client, _ = dist
+    response = client.get("/", headers=GZIP)
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.text == "<html></html>"
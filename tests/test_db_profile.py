@@ -0,0 +1,26 @@
+import sqlite3
+
+import pytest
+
+from app.db import configure_connection
+
+
+def test_writer_connection_uses_wal(tmp_path):
+    conn = sqlite3.connect(tmp_path / "app.db")
+    configure_connection(conn, read_only=False)
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert conn.execute("PRAGMA synchronous").fetchone() == (1,)
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+
+
+def test_reader_connection_refuses_writes(tmp_path):
+    writer = sqlite3.connect(tmp_path / "app.db")
+    configure_connection(writer, read_only=False)
+    writer.execute("CREATE TABLE t (id INTEGER)")
+    writer.commit()
+
+    reader = sqlite3.connect(tmp_path / "app.db")
+    configure_connection(reader, read_only=True)
+    assert reader.execute("SELECT count(*) FROM t").fetchone() == (0,)
+    with pytest.raises(sqlite3.OperationalError):
+        reader.execute("INSERT INTO t VALUES (1)")
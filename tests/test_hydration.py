@@ -0,0 +1,58 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.crud.bulk import upsert_rows
+from app.helpers.hydration import hydrate_startups
+from app.models import Founder, Startup
+
+
+def detail(id: int) -> dict:
+    return {
+        "id": id,
+        "name": f"s{id}",
+        "legal_status": None,
+        "address": None,
+        "email": "s@b.c",
+        "phone": None,
+        "sector": None,
+        "maturity": None,
+        "created_at": None,
+        "description": f"detail {id}",
+        "website_url": None,
+        "social_media_url": None,
+        "project_status": None,
+        "needs": None,
+        "founders": [{"id": 10 * id, "name": "f", "startup_id": id}],
+    }
+
+
+def test_only_upstream_startups_are_hydrated_once(run_db, upstream):
+    upstream.routes["/startups/1"] = (200, detail(1))
+    upstream.routes["/startups/2"] = (200, detail(2))
+
+    async def test(engine):
+        async with async_sessionmaker(engine)() as session:
+            await upsert_rows(
+                session,
+                Startup,
+                [{"id": i, "name": f"s{i}", "email": "s@b.c"} for i in (1, 2)],
+            )
+            await session.commit()
+        async with engine.begin() as conn:
+            await conn.execute(insert(Startup).values(id=3, name="local", email="e"))
+
+        async with upstream.serving(engine):
+            reports = [await hydrate_startups(batch_size=1) for _ in range(2)]
+        async with engine.connect() as conn:
+            descriptions = (
+                await conn.execute(select(Startup.id, Startup.description))
+            ).all()
+            founders = (await conn.scalars(select(Founder.id))).all()
+        return reports, descriptions, founders
+
+    (first, second), descriptions, founders = run_db(test)
+    assert (first.total, first.hydrated, first.failed) == (2, 2, 0)
+    assert second.total == 0
+    assert sorted(descriptions) == [(1, "detail 1"), (2, "detail 2"), (3, None)]
+    assert sorted(founders) == [10, 20]
+    assert "/startups/3" not in upstream.calls
@@ -0,0 +1,160 @@
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.helpers import caching_proxy
+from app.helpers import image_cache as image_cache_module
+from app.helpers.image_cache import ImageCache
+from app.models import ImageCacheEntry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+
+def run_cache(run_db, monkeypatch, tmp_path, test, max_bytes=250):
+    """Runs `test(cache, files)`, `files` making 100 byte cached images."""
+    monkeypatch.setattr(image_cache_module, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(image_cache_module, "time", FakeClock())
+
+    async def main(engine):
+        for attribute in ("async_session", "read_session"):
+            monkeypatch.setattr(
+                image_cache_module, attribute, async_sessionmaker(engine)
+            )
+        cache = ImageCache(max_bytes, interval=60)
+
+        async def files(*names, pinned=False):
+            for name in names:
+                path = tmp_path / f"{name}.png"
+                path.write_bytes(bytes(100))
+                await cache.record(path, pinned=pinned)
+
+        await test(cache, files)
+        async with async_sessionmaker(engine)() as session:
+            indexed = await session.scalars(select(ImageCacheEntry.path))
+            return sorted(path.rsplit("/", 1)[-1] for path in indexed)
+
+    indexed = run_db(main)
+    on_disk = sorted(path.name for path in tmp_path.iterdir())
+    assert indexed == on_disk
+    return on_disk
+
+
+def test_least_recently_used_files_are_evicted(run_db, monkeypatch, tmp_path):
+    async def test(cache, files):
+        await files("a", "b", "c")
+        cache.touch(tmp_path / "a.png")
+        await cache.evict()
+        assert cache.stats()["bytes"] == 200
+        assert cache.stats()["evictions"] == 1
+
+    assert run_cache(run_db, monkeypatch, tmp_path, test) == ["a.png", "c.png"]
+
+
+def test_eviction_goes_below_the_low_watermark(run_db, monkeypatch, tmp_path):
+    async def test(cache, files):
+        await files("a", "b", "c", "d", "e")
+        await cache.evict()
+
+    # 500 bytes over a 410 budget: evict down to 369, not just to 410.
+    remaining = run_cache(run_db, monkeypatch, tmp_path, test, max_bytes=410)
+    assert remaining == ["c.png", "d.png", "e.png"]
+
+
+def test_pinned_and_held_files_are_kept(run_db, monkeypatch, tmp_path):
+    async def test(cache, files):
+        await files("logo", pinned=True)
+        await files("held", "b", "c")
+        cache.hold(tmp_path / "held.png")
+        await cache.evict()
+        assert cache.stats()["pinned"] == 1
+
+    remaining = run_cache(run_db, monkeypatch, tmp_path, test, max_bytes=350)
+    assert remaining == ["c.png", "held.png", "logo.png"]
+
+
+def test_files_held_during_eviction_are_kept(run_db, monkeypatch, tmp_path):
+    async def test(cache, files):
+        await files("a", "b", "c", "d")
+        unlink = Path.unlink
+
+        def unlink_then_hold(path, **kwargs):
+            # A response picks "b" up while "a" is being deleted.
+            cache.hold(tmp_path / "b.png")
+            unlink(path, **kwargs)
+
+        monkeypatch.setattr(Path, "unlink", unlink_then_hold)
+        await cache.evict()
+        monkeypatch.setattr(Path, "unlink", unlink)
+        assert cache.stats()["bytes"] == 200
+
+    # 400 bytes over 250: "a" and "c" go, the held "b" is skipped.
+    remaining = run_cache(run_db, monkeypatch, tmp_path, test)
+    assert remaining == ["b.png", "d.png"]
+
+
+def test_released_files_can_be_evicted(run_db, monkeypatch, tmp_path):
+    async def test(cache, files):
+        await files("a", "b", "c")
+        cache.hold(tmp_path / "a.png")
+        cache.hold(tmp_path / "a.png")
+        cache.release(tmp_path / "a.png")
+        await cache.evict()
+        cache.release(tmp_path / "a.png")
+        await files("d")
+        await cache.evict()
+
+    assert run_cache(run_db, monkeypatch, tmp_path, test) == ["c.png", "d.png"]
+
+
+def test_load_restores_the_index_and_adopts_new_files(run_db, monkeypatch, tmp_path):
+    async def test(cache, files):
+        await files("logo", pinned=True)
+        await files("a")
+        (tmp_path / "new.png").write_bytes(bytes(50))
+        loaded = ImageCache(cache.max_bytes, interval=60)
+        await loaded.load()
+        assert loaded.stats()["files"] == 3
+        assert loaded.stats()["pinned"] == 1
+        assert loaded.stats()["bytes"] == 250
+
+    assert run_cache(run_db, monkeypatch, tmp_path, test, max_bytes=1000) == [
+        "a.png",
+        "logo.png",
+        "new.png",
+    ]
+
+
+def test_image_evicted_mid_request_is_downloaded_again(run_db, upstream, monkeypatch):
+    upstream.routes["/news/1/image"] = (200, b"\x89PNG\r\n\x1a\n" + bytes(64))
+    ensure_image = caching_proxy.ensure_image
+    evict_next = False
+
+    async def ensure_then_evict(api_url, **kwargs):
+        nonlocal evict_next
+        path = await ensure_image(api_url, **kwargs)
+        if evict_next:
+            path.unlink()
+            evict_next = False
+        return path
+
+    monkeypatch.setattr(caching_proxy, "ensure_image", ensure_then_evict)
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            nonlocal evict_next
+            await client.get("/api/news/1/image")
+            evict_next = True
+            return await client.get("/api/news/1/image")
+
+    response = run_db(test)
+    assert response.status_code == 200
+    assert upstream.calls["/news/1/image"] == 2
+    assert caching_proxy.image_cache._held == {}
@@ -0,0 +1,83 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.helpers import image_variants
+from app.helpers.image_variants import render_variant, variant_path
+
+
+def png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "width, height, fmt, name",
+    [
+        (100, None, None, "abc.100x.png"),
+        (None, 50, "webp", "abc.x50.webp"),
+        (100, 50, "png", "abc.100x50.png"),
+    ],
+)
+def test_variant_path(tmp_path, width, height, fmt, name):
+    assert variant_path(tmp_path / "abc.png", width, height, fmt).name == name
+
+
+@pytest.mark.parametrize(
+    "width, height, fmt, size, pil_format",
+    [
+        (100, None, None, (100, 50), "PNG"),
+        (None, 20, "webp", (40, 20), "WEBP"),
+        (100, 100, None, (100, 50), "PNG"),
+        # Never upscaled.
+        (1000, None, "webp", (400, 200), "WEBP"),
+    ],
+)
+def test_render_keeps_the_aspect_ratio(tmp_path, width, height, fmt, size, pil_format):
+    source = tmp_path / "abc.png"
+    source.write_bytes(png(400, 200))
+    destination = variant_path(source, width, height, fmt)
+    render_variant(str(source), str(destination), width, height, fmt, 80)
+    with Image.open(destination) as image:
+        assert (image.size, image.format) == (size, pil_format)
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        ["abc.png", destination.name]
+    )
+
+
+def test_failed_render_leaves_nothing_behind(tmp_path):
+    source = tmp_path / "abc.png"
+    source.write_bytes(b"not an image")
+    with pytest.raises(Exception):
+        render_variant(str(source), str(tmp_path / "abc.1x.png"), 1, None, None, 80)
+    assert [path.name for path in tmp_path.iterdir()] == ["abc.png"]
+
+
+def test_variants_are_rendered_once_in_the_pool(run_db, upstream):
+    upstream.routes["/news/1/image"] = (200, png(400, 200))
+
+    async def test(engine):
+        async with upstream.serving(engine) as client:
+            responses = [
+                await client.get("/api/news/1/image?w=100&format=webp")
+                for _ in range(2)
+            ]
+            original = await client.get("/api/news/1/image")
+        return responses, original
+
+    try:
+        responses, original = run_db(test)
+    finally:
+        image_variants.shutdown_pool()
+
+    first, second = responses
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/webp"
+    assert first.headers["etag"] == second.headers["etag"]
+    with Image.open(io.BytesIO(first.content)) as image:
+        assert image.size == (100, 50)
+    assert original.headers["content-type"] == "image/png"
+    assert upstream.calls["/news/1/image"] == 1
+    assert image_variants.image_cache.stats()["files"] == 2
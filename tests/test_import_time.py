@@ -0,0 +1,16 @@
+import os
+
+from bench_import_time import LAZY_MODULES, fastest_run, total_us
+
+# About 0.6s on a developer laptop; the margin absorbs slower CI machines.
+IMPORT_BUDGET_MS = float(os.environ.get("APP_IMPORT_BUDGET_MS", 1500))
+
+
+def test_heavy_dependencies_are_not_imported_at_startup():
+    _, modules = fastest_run(1)
+    assert [module for module in LAZY_MODULES if module in modules] == []
+
+
+def test_import_time_is_within_budget():
+    timings, _ = fastest_run(3)
+    assert total_us(timings) / 1000 < IMPORT_BUDGET_MS
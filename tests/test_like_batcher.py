@@ -0,0 +1,105 @@
+import asyncio
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.helpers.like_batcher import LikeBatcher
+from app.models import Project, Startup, User
+from app.models._many_to_many import user_likes
+
+
+def batching(test, interval=0.01, max_batch=100):
+    """Seeds users and projects, then runs `test(batcher, engine)`."""
+
+    async def main(engine):
+        async with engine.begin() as conn:
+            await conn.execute(insert(Startup), [{"id": 1, "name": "s", "email": "e"}])
+            await conn.execute(
+                insert(User),
+                [
+                    {"id": i, "email": f"{i}@x.y", "name": "n", "role": "USER"}
+                    for i in range(1, 6)
+                ],
+            )
+            await conn.execute(
+                insert(Project),
+                [
+                    {"id": i, "name": "p", "description": "d", "startup_id": 1}
+                    for i in (1, 2)
+                ],
+            )
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        return await test(LikeBatcher(sessions, interval, max_batch), engine)
+
+    return main
+
+
+async def like_counts(engine) -> dict[int, int]:
+    async with engine.connect() as conn:
+        rows = await conn.execute(select(Project.id, Project.like_count))
+        return dict(rows.all())
+
+
+async def running(batcher, *likes):
+    task = asyncio.create_task(batcher.run())
+    await asyncio.sleep(0)
+    try:
+        return await asyncio.gather(*likes)
+    finally:
+        task.cancel()
+
+
+def test_concurrent_likes_share_one_transaction(run_db):
+    async def test(batcher, engine):
+        results = await running(
+            batcher, *(batcher.like(user, 1) for user in range(1, 6))
+        )
+        return results, batcher.stats(), await like_counts(engine)
+
+    results, stats, counts = run_db(batching(test), migrate=True)
+    assert results == [True] * 5
+    assert stats == {"pending": 0, "batches": 1, "likes": 5}
+    assert counts == {1: 5, 2: 0}
+
+
+def test_duplicate_likes_are_coalesced(run_db):
+    async def test(batcher, engine):
+        results = await running(batcher, batcher.like(1, 2), batcher.like(1, 2))
+        return results, await like_counts(engine)
+
+    results, counts = run_db(batching(test), migrate=True)
+    assert results == [True, False]
+    assert counts == {1: 0, 2: 1}
+
+
+def test_existing_likes_are_refused(run_db):
+    async def test(batcher, engine):
+        async with engine.begin() as conn:
+            await conn.execute(insert(user_likes), [{"user_id": 1, "project_id": 1}])
+        results = await running(batcher, batcher.like(1, 1), batcher.like(2, 1))
+        return results, await like_counts(engine)
+
+    results, counts = run_db(batching(test), migrate=True)
+    assert results == [False, True]
+    assert counts == {1: 2, 2: 0}
+
+
+def test_full_batch_is_flushed_before_the_interval(run_db):
+    async def test(batcher, engine):
+        return await asyncio.wait_for(
+            running(batcher, batcher.like(1, 1), batcher.like(2, 1)), 1
+        )
+
+    results = run_db(batching(test, interval=60, max_batch=2), migrate=True)
+    assert results == [True, True]
+
+
+def test_likes_are_written_directly_when_not_running(run_db):
+    async def test(batcher, engine):
+        results = [await batcher.like(3, 2), await batcher.like(3, 2)]
+        return results, batcher.stats(), await like_counts(engine)
+
+    results, stats, counts = run_db(batching(test), migrate=True)
+    assert results == [True, False]
+    assert stats["batches"] == 2
+    assert counts == {1: 0, 2: 1}
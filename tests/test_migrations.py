@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import delete, insert, select
+
+from app.migrations import MIGRATIONS, MigrationError, get_version, run_migrations
+from app.models import (
+    CacheFreshness,
+    Event,
+    Founder,
+    Project,
+    Startup,
+    SyncWatermark,
+    User,
+)
+from app.models._many_to_many import user_likes
+
+
+def in_order(*steps):
+    """Runs every step on one connection, in one transaction."""
+
+    async def test(engine):
+        async with engine.begin() as conn:
+            return [await step(conn) for step in steps]
+
+    return test
+
+
+async def migrate(conn):
+    await conn.run_sync(run_migrations)
+    return await conn.run_sync(get_version)
+
+
+async def add_users(conn, *emails):
+    await conn.execute(
+        insert(User),
+        [{"email": email, "name": "n", "role": "USER"} for email in emails],
+    )
+
+
+def test_migrations_are_applied_once(run_db):
+    first, second = run_db(in_order(migrate, migrate))
+    assert first == second == len(MIGRATIONS)
+
+
+def test_email_lookup_is_case_insensitive_and_indexed(run_db):
+    async def lookup(conn):
+        await add_users(conn, "Someone@Example.com")
+        stmt = select(User.id).where(User.email_is("someone@example.com"))
+        plan = await conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN "
+            f"{stmt.compile(compile_kwargs={'literal_binds': True})}"
+        )
+        return await conn.scalar(stmt), " ".join(row[-1] for row in plan)
+
+    _, (user_id, plan) = run_db(in_order(migrate, lookup))
+    assert user_id is not None
+    assert "ix_user_email" in plan
+
+
+def test_duplicate_emails_block_the_unique_index(run_db):
+    async def duplicates(conn):
+        await add_users(conn, "a@b.c", "A@B.C")
+
+    with pytest.raises(MigrationError, match="a@b.c"):
+        run_db(in_order(duplicates, migrate))
+
+
+def test_like_count_is_backfilled_and_maintained(run_db):
+    async def seed(conn):
+        await add_users(conn, "a@b.c", "d@e.f")
+        await conn.execute(
+            insert(Startup).values(id=1, name="s", email="s@b.c"),
+        )
+        await conn.execute(
+            insert(Project),
+            [
+                {"id": i, "name": "p", "description": "d", "worth": 1, "startup_id": 1}
+                for i in (1, 2)
+            ],
+        )
+        await conn.execute(insert(user_likes).values(user_id=1, project_id=1))
+
+    async def like_and_unlike(conn):
+        await conn.execute(insert(user_likes).values(user_id=2, project_id=1))
+        await conn.execute(insert(user_likes).values(user_id=2, project_id=2))
+        await conn.execute(delete(user_likes).where(user_likes.c.project_id == 2))
+        return (await conn.execute(select(Project.id, Project.like_count))).all()
+
+    _, _, counts = run_db(in_order(seed, migrate, like_and_unlike))
+    assert counts == [(1, 2), (2, 0)]
+
+
+def test_rows_seen_upstream_are_marked_as_mirrored(run_db):
+    async def seed(conn):
+        await conn.execute(
+            insert(Event), [{"id": i, "name": f"e{i}"} for i in (1, 2, 3, 4)]
+        )
+        await conn.execute(
+            insert(Startup), [{"id": i, "name": "s", "email": "e"} for i in (1, 2)]
+        )
+        await conn.execute(
+            insert(Founder),
+            [{"id": i, "name": "f", "startup_id": i} for i in (1, 2)],
+        )
+        await conn.execute(
+            insert(SyncWatermark),
+            [
+                {"collection": "/events", "synced_at": 0, "upstream_ids": "[1, 2]"},
+                {"collection": "/startups", "synced_at": 0, "upstream_ids": "[1]"},
+            ],
+        )
+        await conn.execute(insert(CacheFreshness).values(key="/events/3", fetched_at=0))
+
+    async def mirrored(conn):
+        return [
+            sorted((await conn.scalars(select(model.id).where(model.upstream))).all())
+            for model in (Event, Startup, Founder)
+        ]
+
+    _, _, flags = run_db(in_order(seed, migrate, mirrored))
+    assert flags == [[1, 2, 3], [1], [1]]
@@ -0,0 +1,72 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.helpers.pagination import (
+    PageRequest,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+from app.models import News
+
+
+def with_news(test, rows=25):
+    async def main(engine):
+        async with engine.begin() as conn:
+            # Gaps and insertion order must not matter, only the key.
+            await conn.execute(
+                insert(News),
+                [{"id": i * 3, "title": f"n{i}"} for i in reversed(range(rows))],
+            )
+        async with AsyncSession(engine) as db:
+            return await test(db)
+
+    return main
+
+
+def test_cursor_round_trip():
+    for key in (0, 1, 42, 2**40):
+        assert decode_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize("cursor", ["", "zzz", "!!", encode_cursor(1)[1:]])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_cover_the_collection_once_in_key_order(run_db):
+    async def walk(db):
+        ids, after, pages = [], None, 0
+        while True:
+            page = await paginate(db, select(News), News.id, PageRequest(after, 10))
+            ids += [news.id for news in page.items]
+            pages += 1
+            if page.next_cursor is None:
+                return ids, pages
+            after = decode_cursor(page.next_cursor)
+
+    ids, pages = run_db(with_news(walk))
+    assert ids == [i * 3 for i in range(25)]
+    assert pages == 3
+
+
+def test_exact_fit_has_no_next_page(run_db):
+    async def first(db):
+        return await paginate(db, select(News), News.id, PageRequest(None, 10))
+
+    page = run_db(with_news(first, rows=10))
+    assert len(page.items) == 10
+    assert page.next_cursor is None
+
+
+def test_past_the_end_is_empty(run_db):
+    async def deep(db):
+        return await paginate(db, select(News), News.id, PageRequest(10**6, 10))
+
+    page = run_db(with_news(deep))
+    assert list(page.items) == []
+    assert page.next_cursor is None
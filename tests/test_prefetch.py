@@ -0,0 +1,65 @@
+from sqlalchemy import insert
+
+from app.helpers import caching_proxy
+from app.helpers.prefetch import prefetch_images
+from app.models import Founder, News, Startup, User
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(64)
+
+
+def test_prefetch_caches_images_and_reports_failures(run_db, upstream):
+    upstream.routes["/news/1/image"] = (200, PNG)
+    upstream.routes["/news/2/image"] = (200, PNG)
+    upstream.routes["/users/1/image"] = (500, {"detail": "boom"})
+
+    async def test(engine):
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(News), [{"id": i, "upstream": True} for i in (1, 2, 3)]
+            )
+            await conn.execute(
+                insert(User),
+                [{"id": 1, "email": "a@b.c", "name": "a", "upstream": True}],
+            )
+        async with upstream.serving(engine):
+            first = await prefetch_images(concurrency=2)
+            second = await prefetch_images(concurrency=2)
+        return first, second
+
+    first, second = run_db(test)
+    assert (first.total, first.fetched, first.failed) == (4, 2, 2)
+    assert sorted((f.url, f.status) for f in first.failures) == [
+        ("/news/3/image", 404),
+        ("/users/1/image", 500),
+    ]
+    # Cached images are not downloaded again, and the 404 is remembered.
+    assert (second.fetched, second.failed) == (2, 2)
+    assert upstream.calls == {
+        "/news/1/image": 1,
+        "/news/2/image": 1,
+        "/news/3/image": 1,
+        "/users/1/image": 2,
+    }
+    assert caching_proxy.upstream_scheduler.stats()["completed"] == {"PREFETCH": 5}
+
+
+def test_locally_created_rows_are_skipped(run_db, upstream):
+    upstream.routes["/news/1/image"] = (200, PNG)
+
+    async def test(engine):
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(News),
+                [{"id": 1, "upstream": True}, {"id": 2, "upstream": False}],
+            )
+            await conn.execute(insert(User), [{"id": 1, "email": "a@b.c", "name": "a"}])
+            await conn.execute(insert(Startup), [{"id": 1, "name": "s", "email": "e"}])
+            await conn.execute(
+                insert(Founder), [{"id": 1, "name": "f", "startup_id": 1}]
+            )
+        async with upstream.serving(engine):
+            return await prefetch_images()
+
+    report = run_db(test)
+    assert (report.total, report.fetched, report.failed) == (1, 1, 0)
+    assert upstream.calls == {"/news/1/image": 1}
@@ -0,0 +1,97 @@
+from app.helpers.pagination import Page
+from app.helpers.response_cache import MISS, ResponseCache, resource_of, size_of
+from app.jeb_schema import NewsBase
+
+
+def test_hit_and_miss_counters():
+    cache = ResponseCache(max_entries=4)
+    assert cache.get("a") is MISS
+    cache.put("a", "news", [1, 2])
+    assert cache.get("a") == [1, 2]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "news", 1)
+    cache.put("b", "news", 2)
+    cache.get("a")
+    cache.put("c", "news", 3)
+    assert cache.get("b") is MISS
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_only_drops_the_resource():
+    cache = ResponseCache(max_entries=8)
+    cache.put("startups", "startups", [])
+    cache.put("startup-1", "startups", {})
+    cache.put("news", "news", [])
+    cache.invalidate("startups")
+    assert cache.get("startups") is MISS
+    assert cache.get("startup-1") is MISS
+    assert cache.get("news") == []
+
+
+def test_put_is_dropped_after_a_concurrent_invalidation():
+    cache = ResponseCache(max_entries=8)
+    version = cache.version("startups")
+    cache.invalidate("startups")
+    cache.put("startups", "startups", b"[]", version=version)
+    assert cache.get("startups") is MISS
+    cache.put("startups", "startups", b"[]", version=cache.version("startups"))
+    assert cache.get("startups") == b"[]"
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResponseCache(max_entries=8)
+    cache.put("a", "news", 1, ttl=0)
+    assert cache.get("a") is MISS
+
+
+def test_resource_of():
+    assert resource_of("/news") == "news"
+    assert resource_of("/startups/{startup_id}/founders/{founder_id}/image") == (
+        "startups"
+    )
+
+
+def test_byte_budget_evicts_large_bodies():
+    cache = ResponseCache(max_entries=8, max_bytes=100)
+    cache.put("a", "news", b"x" * 40)
+    cache.put("b", "news", Page(b"y" * 40, None))
+    cache.get("a")
+    cache.put("c", "events", b"z" * 40)
+    assert cache.get("b") is MISS
+    assert cache.get("a") == b"x" * 40
+    assert cache.stats()["bytes"] == 80
+    assert cache.stats()["evictions"] == 1
+
+    cache.invalidate("news")
+    assert cache.stats()["bytes"] == 40
+
+
+def test_body_over_the_budget_is_not_stored():
+    cache = ResponseCache(max_entries=8, max_bytes=100)
+    cache.put("a", "news", b"x" * 40)
+    cache.put("a", "news", b"x" * 101)
+    assert cache.get("a") is MISS
+    assert cache.stats()["bytes"] == 0
+
+
+def test_models_are_sized_by_their_json_encoding():
+    news = NewsBase(
+        id=1,
+        news_date=None,
+        location=None,
+        title="x" * 1000,
+        category=None,
+        startup_id=None,
+    )
+    assert size_of(news) == len(news.model_dump_json())
+    cache = ResponseCache(max_entries=8, max_bytes=1500)
+    cache.put("a", "news", news)
+    cache.put("b", "news", news)
+    assert cache.get("a") is MISS
+    assert cache.stats()["bytes"] == size_of(news)
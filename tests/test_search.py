@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.bulk import upsert_rows
+from app.crud.search import build_match_query, search
+from app.models import News, Project, Startup
+
+STARTUPS = [
+    {"id": i, "email": "a@b.c", "name": name, "description": text, "sector": sector}
+    for i, name, text, sector in [
+        (1, "Greenfield", "Solar farms", None),
+        (2, "Solaris", None, "Energy"),
+        (3, "Café <Crème>", None, "Food"),
+    ]
+]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("solar", '"solar"*'),
+        ("  green   solar ", '"green"* "solar"*'),
+        ('name:x OR "y" NEAR(z) -w*', '"name"* "x"* "OR"* "y"* "NEAR"* "z"* "w"*'),
+        ("crème brûlée", '"crème"* "brûlée"*'),
+        ("a b c d e f g h i j", " ".join(f'"{t}"*' for t in "abcdefgh")),
+        ("", None),
+        ("*:()\"'", None),
+    ],
+)
+def test_build_match_query(query, expected):
+    assert build_match_query(query) == expected
+
+
+def indexed(test):
+    """Indexes a few startups, a project and a news, then runs `test(db)`."""
+
+    async def main(engine):
+        async with AsyncSession(engine) as db:
+            await upsert_rows(db, Startup, STARTUPS)
+            await upsert_rows(
+                db,
+                Project,
+                [
+                    {
+                        "id": 7,
+                        "name": "Rooftop",
+                        "description": "Solar panels for schools",
+                        "startup_id": 1,
+                    }
+                ],
+            )
+            await upsert_rows(
+                db, News, [{"id": 9, "title": "Solaris raises", "startup_id": 2}]
+            )
+            await db.commit()
+            return await test(db)
+
+    return main
+
+
+def ids(hits):
+    return [(hit.kind, hit.id) for hit in hits]
+
+
+def test_prefix_matches_rank_titles_first(run_db):
+    async def test(db):
+        return await search(db, "sola", ["startups", "projects", "news"], 10)
+
+    hits = run_db(indexed(test), migrate=True)
+    assert ids(hits)[0] == ("startups", 2)
+    assert set(ids(hits)) == {
+        ("startups", 1),
+        ("startups", 2),
+        ("projects", 7),
+        ("news", 9),
+    }
+    assert hits[0].title == "<mark>Solaris</mark>"
+
+
+def test_kinds_and_limit(run_db):
+    async def test(db):
+        return await search(db, "solar", ["projects", "projects"], 1)
+
+    assert ids(run_db(indexed(test), migrate=True)) == [("projects", 7)]
+
+
+def test_diacritics_and_escaping(run_db):
+    async def test(db):
+        return await search(db, "creme", ["startups"], 10)
+
+    (hit,) = run_db(indexed(test), migrate=True)
+    assert hit.title == "Café &lt;<mark>Crème</mark>&gt;"
+
+
+def test_writes_keep_the_index_up_to_date(run_db):
+    async def test(db):
+        await db.execute(update(Startup).where(Startup.id == 2).values(name="Lunar"))
+        await db.execute(delete(Project).where(Project.id == 7))
+        # A sync rewriting unchanged rows must not duplicate index entries.
+        await upsert_rows(db, Startup, STARTUPS[:1])
+        await db.commit()
+        return (
+            await search(db, "solaris", ["startups", "projects"], 10),
+            await search(db, "lunar", ["startups"], 10),
+            await search(db, "solar", ["startups", "projects"], 10),
+        )
+
+    old_name, new_name, solar = run_db(indexed(test), migrate=True)
+    assert ids(old_name) == []
+    assert ids(new_name) == [("startups", 2)]
+    assert ids(solar) == [("startups", 1)]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.helpers.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(10)))
+
+    assert asyncio.run(run()) == [1] * 10
+    assert calls == 1
+
+
+def test_key_is_released_after_completion():
+    flights = SingleFlight()
+
+    async def fetch():
+        return "value"
+
+    async def run():
+        await flights.do("key", fetch)
+        return "key" in flights
+
+    assert asyncio.run(run()) is False
+
+
+def test_exception_is_shared_with_every_waiter():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.do("key", fetch) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.helpers.pagination import PageRequest, paginate
+from app.helpers.sparse_fields import field_selection, list_adapter, select_fields
+from app.jeb_schema import StartupBase
+from app.models import Project, Startup
+from app.proxy_schema import ProjectBase
+
+startup_fields = field_selection(StartupBase)
+
+
+@pytest.mark.parametrize(
+    "fields, expected",
+    [
+        (None, None),
+        ("sector,name", ("id", "name", "sector")),
+        (" name , ,id", ("id", "name")),
+        (",".join(StartupBase.model_fields), None),
+    ],
+)
+def test_field_selection(fields, expected):
+    assert startup_fields(fields) == expected
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as error:
+        startup_fields("name,password")
+    assert error.value.status_code == 400
+    assert "password" in error.value.detail
+
+
+def test_only_selected_columns_are_read():
+    stmt = select_fields(Startup, StartupBase, ("id", "name"))
+    assert [column.name for column in stmt.selected_columns] == ["id", "name"]
+    assert "description" not in str(stmt) and "needs" not in str(stmt)
+
+
+def with_rows(test):
+    async def main(engine):
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(Startup),
+                [
+                    {"id": i, "name": f"s{i}", "email": "e", "needs": "x" * 1000}
+                    for i in range(1, 4)
+                ],
+            )
+            await conn.execute(
+                insert(Project),
+                [
+                    {
+                        "id": 1,
+                        "name": "p",
+                        "description": "d",
+                        "worth": 3,
+                        "startup_id": 1,
+                        "like_count": 7,
+                    }
+                ],
+            )
+        async with AsyncSession(engine) as db:
+            return await test(db)
+
+    return main
+
+
+def encode(pydantic_model, page):
+    adapter = list_adapter(pydantic_model, page.fields)
+    return json.loads(
+        adapter.dump_json(adapter.validate_python(page.items, from_attributes=True))
+    )
+
+
+def test_pages_serialize_only_selected_fields(run_db):
+    async def test(db):
+        stmt = select_fields(Startup, StartupBase, ("id", "name"))
+        return await paginate(db, stmt, Startup.id, PageRequest(None, 2))
+
+    page = run_db(with_rows(test))
+    assert page.fields == ("id", "name")
+    assert encode(StartupBase, page) == [
+        {"id": 1, "name": "s1"},
+        {"id": 2, "name": "s2"},
+    ]
+    assert page.next_cursor is not None
+
+
+def test_all_fields_use_the_full_model(run_db):
+    async def test(db):
+        stmt = select_fields(Project, ProjectBase, None, {"nugget": Project.like_count})
+        return await paginate(db, stmt, Project.id, PageRequest(None, 10))
+
+    page = run_db(with_rows(test))
+    assert list_adapter(ProjectBase, page.fields) is list_adapter(ProjectBase)
+    assert encode(ProjectBase, page) == [
+        {
+            "logo": None,
+            "name": "p",
+            "description": "d",
+            "worth": 3,
+            "nugget": 7,
+            "id": 1,
+            "startup_id": 1,
+        }
+    ]
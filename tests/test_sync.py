@@ -0,0 +1,160 @@
+import json
+
+from sqlalchemy import insert, select
+
+from app.helpers.sync import COLLECTIONS, sync_all, sync_collection
+from app.helpers.warmup import Warmup
+from app.jeb_schema import EventBase, UserBase
+from app.models import Event, SyncWatermark, User
+
+
+def event(id: int, name: str) -> dict:
+    return {
+        "id": id,
+        "name": name,
+        "dates": None,
+        "location": None,
+        "description": None,
+        "event_type": None,
+        "target_audience": None,
+    }
+
+
+def user(id: int, email: str, role: str = "USER") -> dict:
+    return {
+        "id": id,
+        "email": email,
+        "name": email.split("@")[0],
+        "role": role,
+        "founder_id": None,
+        "investor_id": None,
+    }
+
+
+async def watermark(engine, collection: str):
+    async with engine.connect() as conn:
+        return (
+            await conn.execute(
+                select(SyncWatermark).where(SyncWatermark.collection == collection)
+            )
+        ).one_or_none()
+
+
+def counts(result) -> tuple[int, int, int, int]:
+    return result.status, result.inserted, result.updated, result.deleted
+
+
+def test_sync_writes_the_diff_and_advances_the_watermark(run_db, upstream):
+    async def test(engine):
+        async with upstream.serving(engine):
+            upstream.routes["/events"] = (200, [event(i, f"e{i}") for i in (1, 2, 3)])
+            first = await sync_collection("/events", Event, EventBase)
+            first_mark = await watermark(engine, "/events")
+
+            upstream.routes["/events"] = (
+                200,
+                [event(1, "renamed"), event(2, "e2"), event(4, "e4")],
+            )
+            second = await sync_collection("/events", Event, EventBase)
+            second_mark = await watermark(engine, "/events")
+
+        async with engine.connect() as conn:
+            rows = (await conn.execute(select(Event.id, Event.name))).all()
+        return first, first_mark, second, second_mark, rows
+
+    first, first_mark, second, second_mark, rows = run_db(test, migrate=True)
+    assert counts(first) == (200, 3, 0, 0)
+    assert json.loads(first_mark.upstream_ids) == [1, 2, 3]
+    assert counts(second) == (200, 1, 1, 1)
+    assert json.loads(second_mark.upstream_ids) == [1, 2, 4]
+    assert (second_mark.inserted, second_mark.updated, second_mark.deleted) == (1, 1, 1)
+    assert second_mark.synced_at >= first_mark.synced_at
+    assert sorted(rows) == [(1, "renamed"), (2, "e2"), (4, "e4")]
+
+
+def test_failed_fetch_leaves_the_mirror_alone(run_db, upstream):
+    async def test(engine):
+        async with upstream.serving(engine):
+            upstream.routes["/events"] = (200, [event(1, "e1")])
+            await sync_collection("/events", Event, EventBase)
+            before = await watermark(engine, "/events")
+            upstream.routes["/events"] = (500, {"detail": "boom"})
+            result = await sync_collection("/events", Event, EventBase)
+            after = await watermark(engine, "/events")
+        async with engine.connect() as conn:
+            return result, before, after, (await conn.scalars(select(Event.id))).all()
+
+    result, before, after, ids = run_db(test, migrate=True)
+    assert counts(result) == (500, 0, 0, 0)
+    assert after == before
+    assert ids == [1]
+
+
+def test_local_rows_are_never_overwritten_nor_deleted(run_db, upstream):
+    async def test(engine):
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "id": 1,
+                        "email": "admin@demo.com",
+                        "name": "Admin",
+                        "role": "ADMIN",
+                        "authentication_string": "hash",
+                    },
+                    {
+                        "id": 7,
+                        "email": "bob@local.io",
+                        "name": "Bob",
+                        "role": "USER",
+                        "authentication_string": None,
+                    },
+                ],
+            )
+        async with upstream.serving(engine):
+            upstream.routes["/users"] = (
+                200,
+                [
+                    user(1, "jane@upstream.io"),
+                    user(2, "Bob@Local.io"),
+                    user(3, "ann@upstream.io"),
+                ],
+            )
+            first = await sync_collection("/users", User, UserBase)
+            upstream.routes["/users"] = (200, [])
+            second = await sync_collection("/users", User, UserBase)
+        async with engine.connect() as conn:
+            rows = (
+                await conn.execute(
+                    select(User.id, User.email, User.role, User.upstream)
+                )
+            ).all()
+        return first, second, rows
+
+    first, second, rows = run_db(test, migrate=True)
+    assert counts(first) == (200, 1, 0, 0)
+    assert counts(second) == (200, 0, 0, 1)
+    assert sorted(rows) == [
+        (1, "admin@demo.com", "ADMIN", False),
+        (7, "bob@local.io", "USER", False),
+    ]
+
+
+def test_first_pass_skips_collections_the_warm_up_fetched(run_db, upstream):
+    upstream.routes["/events"] = (200, [event(1, "e1")])
+
+    async def test(engine):
+        async with upstream.serving(engine):
+            await Warmup().run()
+            skipping = await sync_all(skip_fresher_than=60)
+            upstream.calls.clear()
+            return skipping, await sync_all()
+
+    skipping, full = run_db(test, migrate=True)
+    # Only /events answered the warm-up, every other collection is retried.
+    assert sorted(result.collection for result in skipping) == sorted(
+        set(COLLECTIONS) - {"/events"}
+    )
+    assert len(full) == len(COLLECTIONS)
+    assert upstream.calls["/events"] == 1
@@ -0,0 +1,116 @@
+import asyncio
+
+from app.helpers.upstream_scheduler import (
+    Priority,
+    TokenBucket,
+    UpstreamScheduler,
+    priority,
+)
+
+
+def unlimited() -> TokenBucket:
+    return TokenBucket(rate=0, burst=1)
+
+
+def test_waiters_are_served_by_priority():
+    scheduler = UpstreamScheduler(1, 1, unlimited())
+    order = []
+
+    async def call(name: str, level: Priority):
+        async with scheduler.slot("/news", level):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def run():
+        async with scheduler.slot("/news"):
+            tasks = [
+                asyncio.create_task(call("prefetch", Priority.PREFETCH)),
+                asyncio.create_task(call("sync", Priority.SYNC)),
+                asyncio.create_task(call("user", Priority.INTERACTIVE)),
+            ]
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["user", "sync", "prefetch"]
+
+
+def test_saturated_route_does_not_block_others():
+    scheduler = UpstreamScheduler(4, 1, unlimited())
+    running = []
+
+    async def call(route: str):
+        async with scheduler.slot(route):
+            running.append((route, scheduler.active))
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(call("/news"), call("/news"), call("/events"))
+
+    asyncio.run(run())
+    assert running == [("/news", 1), ("/events", 2), ("/news", 1)]
+    assert scheduler.stats()["queued"] == {"INTERACTIVE": 1}
+
+
+def test_global_cap_is_respected():
+    scheduler = UpstreamScheduler(2, 10, unlimited())
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with scheduler.slot("/users"):
+            peak = max(peak, scheduler.active)
+            await asyncio.sleep(0.001)
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(8)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert scheduler.active == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = UpstreamScheduler(1, 1, unlimited())
+
+    async def run():
+        async with scheduler.slot("/news"):
+            waiter = asyncio.create_task(scheduler.slot("/news").__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert scheduler.stats()["waiting"] == 0
+        assert scheduler.active == 0
+
+    asyncio.run(run())
+
+
+def test_priority_context_is_inherited_by_tasks():
+    scheduler = UpstreamScheduler(4, 4, unlimited())
+
+    async def call():
+        async with scheduler.slot("/events"):
+            pass
+
+    async def run():
+        with priority(Priority.SYNC):
+            await asyncio.gather(call(), call())
+        await call()
+
+    asyncio.run(run())
+    assert scheduler.stats()["completed"] == {"SYNC": 2, "INTERACTIVE": 1}
+
+
+def test_token_bucket_throttles_past_the_burst():
+    bucket = TokenBucket(rate=100, burst=2)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(4):
+            await bucket.acquire()
+        return loop.time() - start
+
+    elapsed = asyncio.run(run())
+    assert bucket.throttled == 2
+    assert elapsed >= 0.015
@@ -0,0 +1,84 @@
+from fastapi import Response
+from sqlalchemy import select
+
+from app.db import seed_admin
+from app.helpers import caching_proxy
+from app.helpers.sync import sync_collection
+from app.helpers.warmup import StepState, Warmup, check_result
+from app.jeb_schema import UserBase
+from app.models import User
+
+UPSTREAM_USER = {
+    "id": 1,
+    "email": "jane@upstream.io",
+    "name": "Jane",
+    "role": "USER",
+    "founder_id": None,
+    "investor_id": None,
+}
+
+
+def test_unreachable_upstream_fails_every_step(run_db, upstream, monkeypatch):
+    async def test(engine):
+        async with upstream.serving(engine):
+            monkeypatch.setattr(caching_proxy.settings, "jeb_api_url", "http://[::1]:9")
+            warmup = Warmup()
+            await warmup.run()
+            return warmup.status()
+
+    status = run_db(test, migrate=True)
+    assert status.ready
+    assert set(status.steps.values()) == {StepState.FAILED}
+    assert status.done == status.total == 6
+    assert status.warmup_seconds is not None
+
+
+def test_steps_report_their_own_collection(run_db, upstream):
+    upstream.routes["/users"] = (200, [UPSTREAM_USER])
+
+    async def test(engine):
+        async with upstream.serving(engine):
+            warmup = Warmup()
+            assert not warmup.status().ready
+            await warmup.run()
+            return warmup.status()
+
+    status = run_db(test, migrate=True)
+    assert status.steps.pop("users") == StepState.DONE
+    # Every other collection answers 404 on the fake upstream.
+    assert set(status.steps.values()) == {StepState.FAILED}
+
+
+def test_error_results_are_failures():
+    check_result(Response(status_code=204))
+    for result in (Response(status_code=502), {"detail": "External api call fail"}):
+        try:
+            check_result(result)
+        except RuntimeError:
+            continue
+        raise AssertionError(f"{result} passed")
+
+
+def test_admin_is_seeded_after_the_upstream_users(run_db, upstream):
+    upstream.routes["/users"] = (200, [UPSTREAM_USER])
+
+    async def test(engine):
+        async with upstream.serving(engine):
+            await Warmup().run()
+            await seed_admin()
+            await sync_collection("/users", User, UserBase)
+        async with engine.connect() as conn:
+            return (await conn.execute(select(User.id, User.email, User.role))).all()
+
+    assert sorted(run_db(test, migrate=True)) == [
+        (1, "jane@upstream.io", "USER"),
+        (2, "admin@demo.com", "ADMIN"),
+    ]
+
+
+def test_offline_is_ready_immediately():
+    warmup = Warmup()
+    warmup.skip()
+    status = warmup.status()
+    assert status.ready and status.offline
+    assert set(status.steps.values()) == {StepState.SKIPPED}